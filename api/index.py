@@ -1,16 +1,33 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Request, Response, request, jsonify, send_file
+from werkzeug.exceptions import RequestEntityTooLarge
 from flask_cors import CORS
 import os
+import sys
 import time
 from datetime import datetime
 import uuid
 import json
 import re
-import requests
+import html
 from io import BytesIO
-import PyPDF2
-import google.generativeai as genai
 import base64
+import logging
+import gzip
+import hashlib
+import sqlite3
+import threading
+import queue
+import zipfile
+import mimetypes
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from html.parser import HTMLParser
+
+try:
+    import brotli
+except ImportError:  # Optional: brotli variants are only produced when the package is installed
+    brotli = None
 
 from dotenv import load_dotenv
 # Load environment variables from .env file for local development
@@ -26,171 +43,974 @@ class Config:
     UPLOAD_FOLDER = '/tmp/uploads'
     GENERATED_FOLDER = '/tmp/generated'
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+    # Request bodies larger than this are rejected with a 413 before they are read (one PDF plus the form fields)
+    MAX_REQUEST_SIZE = MAX_FILE_SIZE + 64 * 1024
+    # Longest upload accepted, in pages (well above a LinkedIn export's length), and the cache of
+    # extracted text keyed by PDF content hash (0 disables it)
+    PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 50))
+    PDF_CACHE_ENTRIES = int(os.environ.get('PDF_CACHE_ENTRIES', 256))
+    PDF_CACHE_TTL = int(os.environ.get('PDF_CACHE_TTL', 60 * 60))
+
+    # Number of repositories turned into projects, and the size of the GitHub fan-out pool
+    MAX_PROJECTS = 6
+    GITHUB_MAX_WORKERS = int(os.environ.get('GITHUB_MAX_WORKERS', 6))
+
+    # Gemini model and per-key rate budget (requests per minute, burst size, cooldown after a 429)
+    GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-2.0-flash')
+    GEMINI_RPM = float(os.environ.get('GEMINI_RPM', 15))
+    GEMINI_BURST = int(os.environ.get('GEMINI_BURST', 15))
+    GEMINI_COOLDOWN = float(os.environ.get('GEMINI_COOLDOWN', 30))
+    # Concurrent calls allowed per key, and how long a caller may wait for a key that is cooling down
+    GEMINI_KEY_MAX_IN_FLIGHT = int(os.environ.get('GEMINI_KEY_MAX_IN_FLIGHT', 4))
+    GEMINI_MAX_COOLDOWN_WAIT = float(os.environ.get('GEMINI_MAX_COOLDOWN_WAIT', 5))
+    # Upper bound on one Gemini request, retries included; within a generation it is cut to the deadline
+    GEMINI_TIMEOUT = float(os.environ.get('GEMINI_TIMEOUT', 60))
+    # Minimum size of the Gemini call pool; it grows to keys x GEMINI_KEY_MAX_IN_FLIGHT so every key can be used at once
+    GEMINI_MAX_WORKERS = int(os.environ.get('GEMINI_MAX_WORKERS', 8))
+    # Describe all projects with a single prompt, falling back to one call per missing project
+    GEMINI_BATCH_PROJECTS = os.environ.get('GEMINI_BATCH_PROJECTS', 'false').lower() == 'true'
+
+    # Cache of model replies: 'memory', 'sqlite' or 'none'
+    LLM_CACHE_BACKEND = os.environ.get('LLM_CACHE_BACKEND', 'memory').lower()
+    LLM_CACHE_PATH = os.environ.get('LLM_CACHE_PATH', '/tmp/cache/llm.sqlite3')
+    LLM_CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL', 24 * 60 * 60))
+    LLM_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 1000))
+
+    # Conditional-request cache of GitHub API responses: 'sqlite', 'memory' or 'none'
+    GITHUB_CACHE_BACKEND = os.environ.get('GITHUB_CACHE_BACKEND', 'sqlite').lower()
+    GITHUB_CACHE_PATH = os.environ.get('GITHUB_CACHE_PATH', '/tmp/cache/github.sqlite3')
+    GITHUB_CACHE_TTL = int(os.environ.get('GITHUB_CACHE_TTL', 7 * 24 * 60 * 60))
+    GITHUB_CACHE_MAX_ENTRIES = int(os.environ.get('GITHUB_CACHE_MAX_ENTRIES', 2000))
+
+    # Compiled user data of past generations, kept for /api/render: 'sqlite', 'memory' or 'none'
+    GENERATION_STORE_BACKEND = os.environ.get('GENERATION_STORE_BACKEND', 'sqlite').lower()
+    GENERATION_STORE_PATH = os.environ.get('GENERATION_STORE_PATH', '/tmp/cache/generations.sqlite3')
+    GENERATION_STORE_TTL = int(os.environ.get('GENERATION_STORE_TTL', 24 * 60 * 60))
+    GENERATION_STORE_MAX_ENTRIES = int(os.environ.get('GENERATION_STORE_MAX_ENTRIES', 500))
+
+    # Recompile templates whose files changed on disk (always on for the local dev server)
+    TEMPLATE_AUTO_RELOAD = os.environ.get('TEMPLATE_AUTO_RELOAD', 'false').lower() == 'true'
+    # Strip comments, indentation and CSS whitespace from templates when they are compiled
+    TEMPLATE_MINIFY = os.environ.get('TEMPLATE_MINIFY', 'true').lower() == 'true'
+    # 'client' embeds the data for the template script to render in the browser; 'server' writes the
+    # final markup (templates without a server renderer still render client-side)
+    RENDER_MODE = os.environ.get('RENDER_MODE', 'client').lower()
+
+    # Where generated documents live: 'memory' (byte-bounded LRU) or 'local' (content-addressed files in GENERATED_FOLDER)
+    ARTIFACT_STORE = os.environ.get('ARTIFACT_STORE', 'memory').lower()
+    ARTIFACT_MEMORY_MAX_BYTES = int(os.environ.get('ARTIFACT_MEMORY_MAX_BYTES', 64 * 1024 * 1024))
+    ARTIFACT_COMPRESS = os.environ.get('ARTIFACT_COMPRESS', 'true').lower() == 'true'
+    ARTIFACT_MAX_AGE = int(os.environ.get('ARTIFACT_MAX_AGE', 24 * 60 * 60))
+
+    # Wall-clock budget for one generation. Stages that would overrun it fall back to default
+    # content and are reported under 'degraded' instead of failing the request.
+    GENERATION_DEADLINE = float(os.environ.get('GENERATION_DEADLINE', 25))
+    # Per-request cap on GitHub calls, READMEs are skipped once less than README_MIN_BUDGET seconds
+    # remain, and RENDER_RESERVE seconds are kept back from the AI stage for writing the files
+    GITHUB_TIMEOUT = float(os.environ.get('GITHUB_TIMEOUT', 10))
+    README_MIN_BUDGET = float(os.environ.get('README_MIN_BUDGET', 12))
+    RENDER_RESERVE = float(os.environ.get('RENDER_RESERVE', 1))
+
+    # Batch runs (/api/batch and `python api/index.py batch`): profiles generated at once, manifest size
+    # limit, and a per-profile deadline that allows for waiting on the shared Gemini rate budget
+    BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 4))
+    BATCH_MAX_PROFILES = int(os.environ.get('BATCH_MAX_PROFILES', 250))
+    BATCH_PROFILE_DEADLINE = float(os.environ.get('BATCH_PROFILE_DEADLINE', 120))
+    BATCH_MAX_REQUEST_SIZE = int(os.environ.get('BATCH_MAX_REQUEST_SIZE', 200 * 1024 * 1024))
+
+    # Background generation jobs: worker count, max queued/running jobs before 429, and how long results are kept
+    JOB_MAX_WORKERS = int(os.environ.get('JOB_MAX_WORKERS', 4))
+    JOB_MAX_PENDING = int(os.environ.get('JOB_MAX_PENDING', 16))
+    JOB_TTL = int(os.environ.get('JOB_TTL', 60 * 60))
+
+    # DEBUG also dumps the full compiled user data and per-span timings; use WARNING to keep production quiet
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+
+    # Build every service at import instead of on first use (long-running servers that prefer a warm first request)
+    EAGER_INIT = os.environ.get('EAGER_INIT', 'false').lower() == 'true'
+
+class UploadRequest(Request):
+    """Bounds request bodies by MAX_CONTENT_LENGTH, except /api/batch which carries one PDF per profile."""
+    @property
+    def max_content_length(self):
+        if self.path == '/api/batch':
+            return Config.BATCH_MAX_REQUEST_SIZE
+        return super().max_content_length
 
 app = Flask(__name__)
+app.request_class = UploadRequest
+app.config['MAX_CONTENT_LENGTH'] = Config.MAX_REQUEST_SIZE
 CORS(app)
 
-# --- HELPER FUNCTION ---
+# --- Logging & Metrics ---
+logging.basicConfig(format='%(message)s')
+logger = logging.getLogger('portfoliogen')
+logger.setLevel(Config.LOG_LEVEL)
+
 def print_json_data(data, title="DATA"):
-    """Helper function to pretty print JSON data"""
+    """Helper function to pretty print JSON data. Only runs at DEBUG level, since the dump itself is costly."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     try:
-        print(f"\n{'='*50}")
-        print(f"🔍 {title}")
-        print(f"{'='*50}")
-        print(json.dumps(data, indent=2, ensure_ascii=False))
-        print(f"{'='*50}")
-        print(f"✅ END {title}")
-        print(f"{'='*50}\n")
+        logger.debug(f"\n{'='*50}\n🔍 {title}\n{'='*50}\n{json.dumps(data, indent=2, ensure_ascii=False)}\n{'='*50}\n✅ END {title}\n{'='*50}\n")
     except Exception as e:
-        print(f"❌ Error printing {title}: {e}")
+        logger.error(f"❌ Error printing {title}: {e}")
+
+class Metrics:
+    """Thread-safe counters and latency histograms, rendered in the Prometheus text format."""
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.setdefault(key, {'buckets': [0] * len(self.BUCKETS), 'sum': 0.0, 'count': 0})
+            for i, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """Time a block into portfoliogen_stage_duration_seconds{stage=...,outcome=ok|error}."""
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            yield
+            outcome = 'ok'
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe('portfoliogen_stage_duration_seconds', elapsed, stage=stage, outcome=outcome, **labels)
+            logger.debug(f"⏱️ {stage} {labels or ''} took {elapsed * 1000:.1f}ms ({outcome})")
+
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join('%s="%s"' % (key, value.replace('\\', '\\\\').replace('"', '\\"')) for key, value in pairs) + '}'
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (counter_name, labels), value in sorted(self.counters.items()):
+                    if counter_name == name:
+                        lines.append(f"{name}{self._format_labels(labels)} {value}")
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (histogram_name, labels), histogram in sorted(self.histograms.items()):
+                    if histogram_name != name:
+                        continue
+                    for bound, count in zip(self.BUCKETS, histogram['buckets']):
+                        lines.append(f"{name}_bucket{self._format_labels(labels, [('le', str(bound))])} {count}")
+                    lines.append(f"{name}_bucket{self._format_labels(labels, [('le', '+Inf')])} {histogram['count']}")
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {histogram['sum']}")
+                    lines.append(f"{name}_count{self._format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+class Deadline:
+    """Time budget of one generation, shared by every stage, plus the parts that fell back to defaults to meet it."""
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+        self.degraded = []
+        self.lock = threading.Lock()
+
+    def remaining(self, reserve=0.0):
+        return max(0.0, self.expires_at - time.monotonic() - reserve)
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def timeout(self, cap, reserve=0.0):
+        """Timeout for one blocking call: `cap`, shortened to what is left of the budget (less `reserve`)."""
+        return max(0.001, min(cap, self.remaining(reserve)))
+
+    def degrade(self, part, reason):
+        with self.lock:
+            if any(entry['part'] == part for entry in self.degraded):
+                return
+            self.degraded.append({'part': part, 'reason': reason})
+        logger.warning(f"⏳ Degraded {part}: {reason}")
+        metrics.inc('portfoliogen_degraded_total', part=part.split(':')[0])
+
+# --- Caches ---
+
+class MemoryCacheBackend:
+    """In-process LRU store of (value, expires_at) pairs."""
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, expires_at):
+        with self.lock:
+            self.entries[key] = (value, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+class SQLiteCacheBackend:
+    """On-disk LRU store, so cached entries survive across warm serverless invocations."""
+    def __init__(self, path, max_entries):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+        self.conn.commit()
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if row[1] < now:
+                self.conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            else:
+                self.conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            return row[0] if row[1] >= now else None
+
+    def set(self, key, value, expires_at):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)", (key, value, expires_at, time.time()))
+            self.conn.execute("DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+            self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+class LLMCache:
+    """Content-addressed cache of model replies, keyed by a hash of the model name and prompt."""
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Lookups come from several executor threads at once
+        self.stats_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model_name, prompt):
+        return hashlib.sha256(f"{model_name}\0{prompt}".encode('utf-8')).hexdigest()
+
+    def get(self, model_name, prompt):
+        value = self.backend.get(self.make_key(model_name, prompt))
+        with self.stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, model_name, prompt, value):
+        self.backend.set(self.make_key(model_name, prompt), value, time.time() + self.ttl)
+
+    def stats(self):
+        with self.stats_lock:
+            hits, misses = self.hits, self.misses
+        return {'backend': type(self.backend).__name__, 'entries': len(self.backend), 'hits': hits, 'misses': misses}
+
+class HTTPResponseCache:
+    """Stores JSON bodies with their ETag/Last-Modified so requests can be revalidated with a 304."""
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.revalidated = 0
+        self.misses = 0
+        self.stats_lock = threading.Lock()
+
+    def lookup(self, url):
+        entry = self.backend.get(url)
+        return json.loads(entry) if entry is not None else None
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record_revalidated(self):
+        with self.stats_lock:
+            self.revalidated += 1
+
+    def record_miss(self):
+        with self.stats_lock:
+            self.misses += 1
+
+    def store(self, url, response, body):
+        etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        if etag or last_modified:
+            entry = {'etag': etag, 'last_modified': last_modified, 'body': body}
+            self.backend.set(url, json.dumps(entry), time.time() + self.ttl)
+
+    def stats(self):
+        with self.stats_lock:
+            revalidated, misses = self.revalidated, self.misses
+        return {'backend': type(self.backend).__name__, 'entries': len(self.backend), 'revalidated': revalidated, 'misses': misses}
+
+class GenerationStore:
+    """Past generations by id: the compiled user data plus the inputs needed to refresh part of it."""
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+
+    def save(self, record, generation_id=None):
+        generation_id = generation_id or uuid.uuid4().hex
+        self.backend.set(generation_id, json.dumps(record), time.time() + self.ttl)
+        return generation_id
+
+    def load(self, generation_id):
+        value = self.backend.get(generation_id)
+        return json.loads(value) if value is not None else None
+
+    def stats(self):
+        return {'backend': type(self.backend).__name__, 'entries': len(self.backend)}
+
+def create_cache_backend(kind, path, max_entries):
+    if kind == 'memory':
+        return MemoryCacheBackend(max_entries)
+    if kind == 'sqlite':
+        return SQLiteCacheBackend(path, max_entries)
+    return None
+
+def create_llm_cache():
+    backend = create_cache_backend(Config.LLM_CACHE_BACKEND, Config.LLM_CACHE_PATH, Config.LLM_CACHE_MAX_ENTRIES)
+    return LLMCache(backend, Config.LLM_CACHE_TTL) if backend is not None else None
+
+def create_github_cache():
+    backend = create_cache_backend(Config.GITHUB_CACHE_BACKEND, Config.GITHUB_CACHE_PATH, Config.GITHUB_CACHE_MAX_ENTRIES)
+    return HTTPResponseCache(backend, Config.GITHUB_CACHE_TTL) if backend is not None else None
+
+def create_generation_store():
+    backend = create_cache_backend(Config.GENERATION_STORE_BACKEND, Config.GENERATION_STORE_PATH, Config.GENERATION_STORE_MAX_ENTRIES)
+    return GenerationStore(backend, Config.GENERATION_STORE_TTL) if backend is not None else None
+
+# --- Artifact Storage ---
+
+Artifact = namedtuple('Artifact', ['name', 'etag', 'variants'])
+
+def compress_variants(name, data):
+    """Pre-compressed encodings of a document, keyed by Content-Encoding ('identity' is the raw bytes)."""
+    variants = {'identity': data}
+    # Archives are compressed already.
+    if Config.ARTIFACT_COMPRESS and name.endswith('.html'):
+        variants['gzip'] = gzip.compress(data, compresslevel=6)
+        if brotli is not None:
+            variants['br'] = brotli.compress(data)
+    return variants
+
+class MemoryArtifactStore:
+    """In-process LRU of generated documents, bounded by the total bytes of all stored variants."""
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.artifacts = OrderedDict()
+        self.lock = threading.Lock()
+
+    def put(self, name, data):
+        artifact = Artifact(name, os.path.splitext(name)[0], compress_variants(name, data))
+        with self.lock:
+            if name in self.artifacts:
+                self.artifacts.move_to_end(name)
+                return
+            self.artifacts[name] = artifact
+            self.size += sum(len(body) for body in artifact.variants.values())
+            while self.size > self.max_bytes and len(self.artifacts) > 1:
+                _, evicted = self.artifacts.popitem(last=False)
+                self.size -= sum(len(body) for body in evicted.variants.values())
+
+    def get(self, name):
+        with self.lock:
+            artifact = self.artifacts.get(name)
+            if artifact is not None:
+                self.artifacts.move_to_end(name)
+            return artifact
+
+class LocalArtifactStore:
+    """Content-addressed files on disk. Variants are file paths so responses can be streamed."""
+    ENCODING_SUFFIXES = {'identity': '', 'gzip': '.gz', 'br': '.br'}
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def put(self, name, data):
+        path = os.path.join(self.root, name)
+        if os.path.exists(path):
+            return
+        for encoding, body in compress_variants(name, data).items():
+            # Write then rename so a concurrent reader never sees a partial file.
+            tmp_path = f"{path}{self.ENCODING_SUFFIXES[encoding]}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path + self.ENCODING_SUFFIXES[encoding])
+
+    def get(self, name):
+        path = os.path.join(self.root, name)
+        if not name.endswith(('.html', '.zip')) or not os.path.isfile(path):
+            return None
+        variants = {encoding: path + suffix for encoding, suffix in self.ENCODING_SUFFIXES.items() if os.path.isfile(path + suffix)}
+        return Artifact(name, os.path.splitext(name)[0], variants)
+
+def read_artifact(artifact):
+    body = artifact.variants['identity']
+    if isinstance(body, bytes):
+        return body
+    with open(body, 'rb') as f:
+        return f.read()
+
+def create_artifact_store():
+    if Config.ARTIFACT_STORE == 'local':
+        return LocalArtifactStore(Config.GENERATED_FOLDER)
+    return MemoryArtifactStore(Config.ARTIFACT_MEMORY_MAX_BYTES)
+
+def artifact_response(artifact, as_attachment=False):
+    """Serve an artifact with ETag revalidation, Range support and the best pre-compressed variant."""
+    encoding = 'identity'
+    # Byte ranges always refer to the identity encoding.
+    if 'Range' not in request.headers:
+        for candidate in ('br', 'gzip'):
+            if candidate in artifact.variants and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+    body = artifact.variants[encoding]
+    etag = artifact.etag if encoding == 'identity' else f"{artifact.etag}-{encoding}"
+    mimetype = mimetypes.guess_type(artifact.name)[0] or 'application/octet-stream'
+    if isinstance(body, bytes):
+        response = Response(body, mimetype=mimetype)
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = Config.ARTIFACT_MAX_AGE
+        response.make_conditional(request, accept_ranges=True, complete_length=len(body))
+    else:
+        # Files on disk are streamed by send_file, which handles Range and conditionals itself.
+        response = send_file(body, mimetype=mimetype, etag=etag, conditional=True, max_age=Config.ARTIFACT_MAX_AGE)
+        response.cache_control.public = True
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    if as_attachment:
+        response.headers['Content-Disposition'] = f'attachment; filename={artifact.name}'
+    return response
 
 # --- Service Classes ---
 
+class PDFTooLargeError(ValueError):
+    pass
+
 class PDFParser:
+    # Section headers of a LinkedIn export, each on a line of its own, mapped to the section they start.
+    SECTION_HEADERS = {
+        'contact': 'contact', 'top skills': 'skills', 'skills': 'skills', 'languages': 'languages',
+        'certifications': 'certifications', 'honors-awards': 'honors', 'publications': 'publications',
+        'summary': 'summary', 'experience': 'experience', 'education': 'education',
+    }
+    HEADER_LINE = re.compile(r"^(%s)$" % "|".join(re.escape(header) for header in SECTION_HEADERS), re.IGNORECASE)
+    # The sidebar comes first and has no closing header: it runs into the name, headline and location
+    # that open the main column, just above its first section.
+    SIDEBAR_SECTIONS = {'contact', 'skills', 'languages', 'certifications', 'honors', 'publications'}
+    PAGE_FOOTER = re.compile(r"^Page \d+ of \d+$", re.IGNORECASE)
+    DATE_RANGE = re.compile(r"^(?:[A-Za-z]+ )?\d{4}\s*[-–]\s*(?:(?:[A-Za-z]+ )?\d{4}|Present)(?:\s*\(.*\))?$", re.IGNORECASE)
+    EDUCATION_DETAIL = re.compile(r"^(?P<degree>.*?)\s*·\s*\((?P<date>.*)\)$")
+    # A company with several roles is headed by its name and total tenure, e.g. "5 years 3 months".
+    DURATION = re.compile(r"^(?=\d)(?:(?P<years>\d+) years?)?\s*(?:(?P<months>\d+) months?)?$", re.IGNORECASE)
+    # Locations are "Remote"-style keywords, "City, Region[, Country]" or "... Area"; other short lines are description.
+    PLACE = r"[A-Z][\w.'’-]*(?: [A-Z][\w.'’-]*)*"
+    LOCATION = re.compile(rf"^(?:Remote|Hybrid|On-site|{PLACE}(?:, {PLACE}){{1,2}}|{PLACE} (?:Area|Region))$")
+    MONTHS = ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec')
+
+    def __init__(self, cache=None):
+        self.cache = cache
+
+    @staticmethod
+    def _content_hash(stream):
+        digest = hashlib.sha256()
+        stream.seek(0)
+        for chunk in iter(lambda: stream.read(64 * 1024), b''):
+            digest.update(chunk)
+        stream.seek(0)
+        return digest.hexdigest()
+
     def extract_text_from_pdf(self, pdf_file):
-        print("\n📄 [1/5] Starting PDF Text Extraction...")
+        logger.info("📄 [1/5] Starting PDF Text Extraction...")
         try:
-            pdf_file.seek(0)
-            pdf_reader = PyPDF2.PdfReader(BytesIO(pdf_file.read()))
-            text = ""
+            # Werkzeug uploads wrap a seekable stream; read from it in place instead of copying it.
+            stream = getattr(pdf_file, 'stream', pdf_file)
+            stream.seek(0, os.SEEK_END)
+            size = stream.tell()
+            if size > Config.MAX_FILE_SIZE:
+                raise PDFTooLargeError(f"PDF is {size} bytes, larger than the {Config.MAX_FILE_SIZE} byte limit")
+            content_hash = self._content_hash(stream) if self.cache is not None else None
+            if content_hash is not None:
+                cached = self.cache.get(content_hash)
+                if cached is not None:
+                    logger.info("📄 [1/5] ✅ PDF Text served from cache.")
+                    return cached
+
+            import PyPDF2  # Deferred: only generation requests need the PDF reader
+            stream.seek(0)
+            pdf_reader = PyPDF2.PdfReader(stream)
+            # Rejected rather than truncated: Education comes last in an export and would be lost.
+            if len(pdf_reader.pages) > Config.PDF_MAX_PAGES:
+                raise PDFTooLargeError(f"PDF has {len(pdf_reader.pages)} pages, more than the {Config.PDF_MAX_PAGES} page limit")
+            parts = []
             for page in pdf_reader.pages:
                 page_text = page.extract_text()
                 if page_text and page_text.strip():
-                    text += page_text + "\n"
-            
-            print("\n" + "=" * 50)
-            print("📝 FULL EXTRACTED PDF TEXT:")
-            print("=" * 50)
-            print(text)
-            print("=" * 50)
-
-            print("📄 [1/5] ✅ PDF Text Extraction Successful.")
+                    parts.append(page_text)
+            text = "".join(part + "\n" for part in parts)
+
+            if content_hash is not None:
+                self.cache.set(content_hash, text, time.time() + Config.PDF_CACHE_TTL)
+            logger.info(f"📄 [1/5] ✅ PDF Text Extraction Successful ({len(parts)} page(s), {len(text)} characters).")
             return text
+        except PDFTooLargeError:
+            raise
         except Exception as e:
-            print(f"📄 [1/5] ❌ CRITICAL ERROR in PDF extraction: {e}")
+            logger.error(f"📄 [1/5] ❌ CRITICAL ERROR in PDF extraction: {e}")
             raise Exception(f"Failed to parse PDF: {e}")
 
+    def tokenize_sections(self, text):
+        """Split text into {section: [lines]} in a single pass over its lines.
+
+        Page footers are dropped, so sections run on across page breaks. The profile block between
+        the sidebar and the first main-column section is split off into 'profile'.
+        """
+        sections, current = {}, None
+        for raw_line in text.split('\n'):
+            line = raw_line.strip()
+            if not line:
+                continue
+            header = self.HEADER_LINE.match(line)
+            if header:
+                section = self.SECTION_HEADERS[header.group(1).lower()]
+                if current in self.SIDEBAR_SECTIONS and section not in self.SIDEBAR_SECTIONS and 'profile' not in sections:
+                    sections[current], sections['profile'] = self._split_profile(sections[current])
+                current = section
+                sections.setdefault(current, [])
+            elif current and not self.PAGE_FOOTER.match(line):
+                sections[current].append(line)
+        return sections
+
+    def _split_profile(self, lines):
+        """(sidebar lines, profile lines): the name and headline, plus the location when the last line is one."""
+        size = min(len(lines), 3 if lines and self.LOCATION.match(lines[-1]) else 2)
+        return lines[:len(lines) - size], lines[len(lines) - size:]
+
+    def _months(self, text):
+        match = self.DURATION.match(text)
+        return int(match.group('years') or 0) * 12 + int(match.group('months') or 0) if match else None
+
+    def _month_index(self, text):
+        match = re.match(r"(?:([A-Za-z]+) )?(\d{4})", text)
+        month = match.group(1)[:3].lower() if match.group(1) else 'jan'
+        return int(match.group(2)) * 12 + (self.MONTHS.index(month) if month in self.MONTHS else 0)
+
+    def _role_span(self, date_line):
+        """(first month, month after the last) of a role's date line, or None when its end is unknown."""
+        start = self._month_index(date_line)
+        duration = re.search(r"\(([^)]*)\)\s*$", date_line)
+        months = self._months(duration.group(1).strip()) if duration else None
+        if months is not None:
+            return start, start + months
+        end = re.search(r"[-–]\s*((?:[A-Za-z]+ )?\d{4})", date_line)
+        return (start, self._month_index(end.group(1)) + 1) if end else None
+
+    def _experience_records(self, lines):
+        # Each role is anchored on its date line: the title precedes it and the location may follow it.
+        # A single role has its company just above the title. Several roles at one company share a
+        # "Company / total tenure" header, and the company's roles end once they cover that tenure.
+        date_indexes = [i for i, line in enumerate(lines) if self.DATE_RANGE.match(line)]
+        if not date_indexes:
+            return [{"company": lines[i], "jobTitle": lines[i+1], "date": lines[i+2], "location": lines[i+3]} for i in range(0, len(lines) - 3, 4)]
+        roles, group = [], None
+        for i in date_indexes:
+            tenure = self._months(lines[i - 2]) if i >= 3 else None
+            if tenure is not None:
+                group = {'company': lines[i - 3], 'tenure': tenure, 'end': None}
+                first_line = i - 3
+            elif group is not None:
+                first_line = i - 1
+            else:
+                first_line = max(i - 2, 0)
+            roles.append((i, first_line, group['company'] if group else (lines[i - 2] if i >= 2 else "")))
+            if group is not None:
+                span = self._role_span(lines[i])
+                if span is not None:
+                    group['end'] = group['end'] or span[1]
+                    # A month of slack for LinkedIn's rounding of the total.
+                    if group['end'] - span[0] >= group['tenure'] - 1:
+                        group = None
+        records = []
+        for n, (i, _, company) in enumerate(roles):
+            next_role_start = roles[n + 1][1] if n + 1 < len(roles) else len(lines)
+            location = lines[i + 1] if i + 1 < next_role_start and self.LOCATION.match(lines[i + 1]) else ""
+            records.append({"company": company, "jobTitle": lines[i - 1] if i >= 1 else "", "date": lines[i], "location": location})
+        return records
+
+    def _education_records(self, lines):
+        records = []
+        for i in range(0, len(lines) - 1, 2):
+            record = {"school": lines[i], "date": lines[i + 1]}
+            detail = self.EDUCATION_DETAIL.match(lines[i + 1])
+            if detail:
+                record.update(degree=detail.group('degree'), date=detail.group('date'))
+            records.append(record)
+        return records
+
+    def parse_sections(self, text):
+        """Parse every recognised section of a LinkedIn export into structured records."""
+        logger.info("📄 [2/5] Starting PDF Section Parsing...")
+        with metrics.span('section_parse'):
+            sections = self.tokenize_sections(text)
+            parsed = {
+                "summary": " ".join(sections.get('summary', [])),
+                "experience": self._experience_records(sections.get('experience', [])),
+                "education": self._education_records(sections.get('education', [])),
+                "skills": sections.get('skills', []),
+                "certifications": [{"name": line} for line in sections.get('certifications', [])],
+                "languages": sections.get('languages', []),
+            }
+        logger.info("📄 [2/5] ✅ PDF Sections Parsed Successfully.")
+        return parsed
+
     def extract_sections(self, text):
-        print("📄 [2/5] Starting PDF Section Parsing...")
-        experiences, education = [], []
-        exp_match = re.search(r"Experience(.*?)(Education|Skills|$)", text, re.DOTALL | re.IGNORECASE)
-        if exp_match:
-            exp_text = exp_match.group(1).strip()
-            lines = [line.strip() for line in exp_text.split('\n') if line.strip()]
-            i = 0
-            while i + 3 < len(lines):
-                experiences.append({"company": lines[i], "jobTitle": lines[i+1], "date": lines[i+2], "location": lines[i+3]})
-                i += 4
-        edu_match = re.search(r"Education(.*?)(Experience|Skills|Page|$)", text, re.DOTALL | re.IGNORECASE)
-        if edu_match:
-            edu_text = edu_match.group(1).strip()
-            lines = [line.strip() for line in edu_text.split('\n') if line.strip()]
-            i = 0
-            while i + 1 < len(lines):
-                school, date = lines[i], lines[i+1]
-                if "Page" in school or "Page" in date: break
-                education.append({"school": school, "date": date})
-                i += 2
-        print("📄 [2/5] ✅ PDF Sections Parsed Successfully.")
-        return experiences, education
+        sections = self.parse_sections(text)
+        return sections['experience'], sections['education']
 
 class GitHubService:
-    def __init__(self, token=None):
+    def __init__(self, token=None, max_workers=None, cache=None):
         self.base_url = "https://api.github.com"
         self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.max_workers = max_workers or Config.GITHUB_MAX_WORKERS
+        import requests  # Deferred with the service itself to keep cold starts light
+        from requests.adapters import HTTPAdapter
+        # One keep-alive session shared by every request; the adapter pool is sized
+        # so each fan-out worker can hold its own connection to api.github.com.
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers + 2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="github")
+        self.cache = cache
+        self.timeout_errors = (requests.exceptions.Timeout,)
 
     def extract_username_from_url(self, github_url):
         match = re.search(r'github\.com/([^/]+)', github_url)
         if match: return match.group(1)
         raise ValueError("Invalid GitHub URL format")
 
-    def get_readme_content(self, owner, repo_name):
+    def _get_json(self, url, endpoint, deadline=None):
+        timeout = deadline.timeout(Config.GITHUB_TIMEOUT) if deadline is not None else Config.GITHUB_TIMEOUT
+        if self.cache is None:
+            with metrics.span('github_request', endpoint=endpoint):
+                response = self.session.get(url, timeout=timeout)
+                response.raise_for_status()
+            return response.json()
+        cached = self.cache.lookup(url)
+        with metrics.span('github_request', endpoint=endpoint):
+            response = self.session.get(url, headers=self.cache.conditional_headers(cached), timeout=timeout)
+        if response.status_code == 304 and cached is not None:
+            self.cache.record_revalidated()
+            metrics.inc('portfoliogen_github_not_modified_total', endpoint=endpoint)
+            return cached['body']
+        self.cache.record_miss()
+        response.raise_for_status()
+        body = response.json()
+        self.cache.store(url, response, body)
+        return body
+
+    def get_readme_content(self, owner, repo_name, deadline=None):
         try:
-            readme_url = f"{self.base_url}/repos/{owner}/{repo_name}/readme"
-            response = requests.get(readme_url, headers=self.headers)
-            response.raise_for_status()
-            content_encoded = response.json().get('content', '')
+            content_encoded = self._get_json(f"{self.base_url}/repos/{owner}/{repo_name}/readme", 'readme', deadline).get('content', '')
             if content_encoded:
                 return base64.b64decode(content_encoded).decode('utf-8')
             return None
+        except self.timeout_errors:
+            if deadline is not None:
+                deadline.degrade(f"readme:{repo_name}", "README request timed out; described from the repository metadata")
+            return None
         except Exception:
             return None
 
-    def get_user_data(self, github_url):
-        print("🐙 [3/5] Starting GitHub Data Fetching...")
+    def get_user_data(self, github_url, deadline=None):
+        logger.info("🐙 [3/5] Starting GitHub Data Fetching...")
         try:
             username = self.extract_username_from_url(github_url)
-            user_response = requests.get(f"{self.base_url}/users/{username}", headers=self.headers)
-            user_response.raise_for_status()
-            user_data = user_response.json()
-            repos_response = requests.get(f"{self.base_url}/users/{username}/repos?sort=updated&per_page=10", headers=self.headers)
-            repos_response.raise_for_status()
-            repos_data = repos_response.json()
+            # The profile and the repo list are independent, so fetch them together.
+            user_future = self.executor.submit(self._get_json, f"{self.base_url}/users/{username}", 'user', deadline)
+            repos_future = self.executor.submit(self._get_json, f"{self.base_url}/users/{username}/repos?sort=updated&per_page=10", 'repos', deadline)
+            user_data = user_future.result()
+            repos_data = repos_future.result()
             result = {
                 'profile': user_data,
-                'repositories': self._process_repositories(repos_data, user_data)
+                'repositories': self._process_repositories(repos_data, user_data, deadline)
             }
-            print("🐙 [3/5] ✅ GitHub Data Fetched Successfully.")
+            logger.info("🐙 [3/5] ✅ GitHub Data Fetched Successfully.")
             return result
         except Exception as e:
-            print(f"🐙 [3/5] ❌ Error fetching GitHub data: {e}")
+            logger.error(f"🐙 [3/5] ❌ Error fetching GitHub data: {e}")
             raise Exception(f"Failed to fetch GitHub data: {e}")
 
-    def _process_repositories(self, repos, owner_profile):
-        processed_repos = []
+    def _process_repositories(self, repos, owner_profile, deadline=None):
         owner_login = owner_profile.get('login')
         if not owner_login: return []
-        for repo in repos:
-            if not repo.get('fork', False) and repo.get('size', 0) > 0:
-                readme_content = self.get_readme_content(owner_login, repo.get('name'))
-                processed_repos.append({
-                    'name': repo.get('name'),
-                    'description': repo.get('description'),
-                    'language': repo.get('language'),
-                    'topics': repo.get('topics', []),
-                    'readme': readme_content,
-                    'html_url': repo.get('html_url')
-                })
-        return processed_repos[:6]
+        # Eligibility only depends on the repo listing, so pick the first
+        # MAX_PROJECTS candidates up front and fetch just their READMEs.
+        eligible = [repo for repo in repos if not repo.get('fork', False) and repo.get('size', 0) > 0][:Config.MAX_PROJECTS]
+        if deadline is not None and eligible and deadline.remaining() < Config.README_MIN_BUDGET:
+            # READMEs only enrich the prompts; keep what is left of the budget for the AI stage.
+            deadline.degrade('readmes', f"skipped {len(eligible)} README fetch(es) with {deadline.remaining():.1f}s left")
+            readmes = [None] * len(eligible)
+        else:
+            readmes = self.executor.map(lambda repo: self.get_readme_content(owner_login, repo.get('name'), deadline), eligible)
+        return [{
+            'name': repo.get('name'),
+            'description': repo.get('description'),
+            'language': repo.get('language'),
+            'topics': repo.get('topics', []),
+            'readme': readme_content,
+            'html_url': repo.get('html_url')
+        } for repo, readme_content in zip(eligible, readmes)]
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens per second, holding at most `capacity`."""
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        """Take a token if one is available. Returns 0 on success, otherwise the seconds until the next token."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+class GeminiKey:
+    """One API key with its own model client, rate budget and health state."""
+    def __init__(self, index, model, bucket):
+        self.index = index
+        self.model = model
+        self.bucket = bucket
+        self.cooldown_until = 0.0
+        self.last_limited_at = 0.0
+        self.in_flight = 0
+        self.calls = 0
+        self.rate_limited = 0
+        self.errors = 0
+
+class GeminiKeyPool:
+    """Hands out API keys to concurrent callers.
+
+    A key is only handed out when it is not cooling down after a 429, has token-bucket budget
+    left and is below its in-flight cap. Among those, keys that were rate-limited least
+    recently (and then the least busy ones) are preferred.
+    """
+    RETRY_AFTER = re.compile(r"retry in ([\d.]+)\s*s|retry_delay\s*\{\s*seconds:\s*(\d+)|retry-after:?\s*([\d.]+)", re.IGNORECASE)
+
+    def __init__(self, models, rpm, burst, max_in_flight):
+        self.keys = [GeminiKey(i, model, TokenBucket(rpm / 60, burst)) for i, model in enumerate(models)]
+        self.max_in_flight = max_in_flight
+        self.condition = threading.Condition()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def acquire(self, exclude, deadline=None):
+        """Block until a key outside `exclude` is usable and return it, or None if all of them are cooling down
+        (or `deadline` runs out first)."""
+        with self.condition:
+            while True:
+                if deadline is not None and deadline.expired():
+                    return None
+                now = time.monotonic()
+                remaining = [key for key in self.keys if key.index not in exclude]
+                ready = [key for key in remaining if key.cooldown_until <= now and key.in_flight < self.max_in_flight]
+                ready.sort(key=lambda key: (key.last_limited_at, key.in_flight, key.calls))
+                waits = []
+                for key in ready:
+                    wait = key.bucket.try_acquire()
+                    if wait == 0:
+                        key.in_flight += 1
+                        key.calls += 1
+                        return key
+                    waits.append(wait)
+                cooling = [key.cooldown_until - now for key in remaining if key.cooldown_until > now]
+                if len(cooling) == len(remaining) and (not cooling or min(cooling) > Config.GEMINI_MAX_COOLDOWN_WAIT):
+                    return None
+                # Wake up when a token refills, a cooldown ends, or another caller releases a key.
+                wait = min(waits + cooling + [1.0])
+                self.condition.wait(timeout=deadline.timeout(wait) if deadline is not None else wait)
+
+    def release(self, key, error=None):
+        with self.condition:
+            key.in_flight -= 1
+            if error is not None and self.is_rate_limit(error):
+                key.rate_limited += 1
+                key.last_limited_at = time.monotonic()
+                key.cooldown_until = key.last_limited_at + self.retry_after(error)
+            elif error is not None:
+                key.errors += 1
+            self.condition.notify_all()
+
+    @staticmethod
+    def is_rate_limit(error):
+        return "rate limit" in str(error).lower() or "429" in str(error)
+
+    def retry_after(self, error):
+        """Seconds to rest a key, from the retry delay the API sent back if there is one."""
+        match = self.RETRY_AFTER.search(str(error))
+        if match:
+            return float(next(group for group in match.groups() if group))
+        return Config.GEMINI_COOLDOWN
+
+    def stats(self):
+        now = time.monotonic()
+        with self.condition:
+            return [{
+                'index': key.index, 'calls': key.calls, 'in_flight': key.in_flight, 'rate_limited': key.rate_limited,
+                'errors': key.errors, 'cooldown_remaining': round(max(0.0, key.cooldown_until - now), 1),
+                'tokens': round(key.bucket.tokens, 1),
+            } for key in self.keys]
+
+class TimeoutClient:
+    """Wraps a GenerativeServiceClient so every generate_content call carries the timeout GeminiService set
+    for the calling thread. google-generativeai 0.3 has no per-call option, and its default is 60 s plus retries."""
+    call = threading.local()
+
+    def __init__(self, client):
+        self.client = client
+
+    def generate_content(self, request, **kwargs):
+        kwargs.setdefault('timeout', getattr(self.call, 'timeout', Config.GEMINI_TIMEOUT))
+        return self.client.generate_content(request, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
 
 class GeminiService:
-    def __init__(self, api_keys):
+    def __init__(self, api_keys, model_factory=None, cache=None):
         if not api_keys or api_keys == ['']: 
             raise ValueError("❌ No Gemini API keys provided.")
         self.api_keys = api_keys
-        self.current_key_index = 0
-        genai.configure(api_key=self.api_keys[self.current_key_index])
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
-        print(f"🤖 GeminiService initialized with {len(self.api_keys)} API key(s).")
-
-    def _rotate_key(self):
-        self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
-        new_key = self.api_keys[self.current_key_index]
-        genai.configure(api_key=new_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
-        print(f"🔄 Rotated to Gemini API key index {self.current_key_index}")
-
-    def generate_content(self, prompt: str):
-        for _ in range(len(self.api_keys)):
+        # Every key gets its own client, so requests on different keys never share
+        # the process-global genai configuration.
+        self.model_factory = model_factory or self._build_model
+        self.key_pool = GeminiKeyPool([self.model_factory(key) for key in self.api_keys], Config.GEMINI_RPM, Config.GEMINI_BURST, Config.GEMINI_KEY_MAX_IN_FLIGHT)
+        self.executor = ThreadPoolExecutor(max_workers=max(Config.GEMINI_MAX_WORKERS, len(self.key_pool) * self.key_pool.max_in_flight),
+                                           thread_name_prefix="gemini")
+        self.cache = cache
+        logger.info(f"🤖 GeminiService initialized with {len(self.api_keys)} API key(s).")
+
+    @staticmethod
+    def _build_model(api_key):
+        # Deferred: importing the Gemini SDK dominates cold-start time.
+        import google.generativeai as genai
+        import google.ai.generativelanguage as glm
+        model = genai.GenerativeModel(Config.GEMINI_MODEL)
+        model._client = TimeoutClient(glm.GenerativeServiceClient(client_options={"api_key": api_key}))
+        return model
+
+    def generate_content(self, prompt: str, deadline=None, refresh=False):
+        """Reply to `prompt`. With `refresh`, a cached reply is ignored (and replaced by the new one)."""
+        if self.cache is not None and not refresh:
+            cached = self.cache.get(Config.GEMINI_MODEL, prompt)
+            metrics.inc('portfoliogen_llm_cache_requests_total', result='hit' if cached is not None else 'miss')
+            if cached is not None:
+                return cached
+        tried = set()
+        while len(tried) < len(self.key_pool):
+            key = self.key_pool.acquire(exclude=tried, deadline=deadline)
+            if key is None:
+                break
+            if tried:
+                metrics.inc('portfoliogen_gemini_retries_total')
+            # A call the deadline has given up on must not keep its thread and key slot for the SDK's full timeout.
+            TimeoutClient.call.timeout = deadline.timeout(Config.GEMINI_TIMEOUT, reserve=Config.RENDER_RESERVE) if deadline is not None else Config.GEMINI_TIMEOUT
             try:
-                response = self.model.generate_content(prompt)
-                return response.text.strip()
+                with metrics.span('gemini_call', key=key.index):
+                    text = key.model.generate_content(prompt).text.strip()
             except Exception as e:
-                if "rate limit" in str(e).lower() or "429" in str(e):
-                    print(f"🕒 Rate limit hit on key index {self.current_key_index}. Rotating key...")
-                    self._rotate_key()
-                else: raise e
+                self.key_pool.release(key, error=e)
+                if self.key_pool.is_rate_limit(e):
+                    logger.warning(f"🕒 Rate limit hit on key index {key.index}. Cooling it down and trying another key...")
+                    metrics.inc('portfoliogen_gemini_rate_limited_total', key=key.index)
+                    metrics.inc('portfoliogen_gemini_key_rotations_total')
+                    tried.add(key.index)
+                    continue
+                raise e
+            self.key_pool.release(key)
+            if self.cache is not None:
+                self.cache.set(Config.GEMINI_MODEL, prompt, text)
+            return text
+        if deadline is not None and deadline.expired():
+            raise TimeoutError("❌ Generation deadline reached before a Gemini key was available.")
         raise Exception("❌ All Gemini API keys are rate-limited or invalid.")
 
-    def generate_resume_summary(self, resume_text: str) -> str:
+    @staticmethod
+    def default_summary():
+        return "A passionate developer skilled in creating dynamic and user-friendly applications."
+
+    @staticmethod
+    def default_project_description(project_name):
+        return f"A project named '{project_name}' that showcases practical application of technical skills."
+
+    def generate_resume_summary(self, resume_text: str, deadline=None, refresh=False) -> str:
         prompt = f"Based on the following resume text, create a compelling professional summary of 4-5 lines.Do not provide multiple options or explanations.\n\n**Resume Text:**\n---\n{resume_text}\n---Output only the final summary without any prefacing text, options, or additional commentary."
         try:
-            return self.generate_content(prompt)
+            return self.generate_content(prompt, deadline, refresh)
         except Exception as e:
-            print(f"❌ Error in generate_resume_summary: {e}")
-            return "A passionate developer skilled in creating dynamic and user-friendly applications."
+            logger.error(f"❌ Error in generate_resume_summary: {e}")
+            if deadline is not None:
+                deadline.degrade('summary', f"used default text ({e})")
+            return self.default_summary()
 
-    def generate_project_description(self, project_name: str, project_context: str) -> str:
+    def generate_project_description(self, project_name: str, project_context: str, deadline=None, refresh=False) -> str:
         prompt = f"""
         Act as an expert technical copywriter for a professional resume. Your task is to write a compelling, results-oriented description for the software project detailed below.
         **CRITICAL INSTRUCTIONS:**
@@ -209,10 +1029,83 @@ class GeminiService:
         ---
         """
         try:
-            return self.generate_content(prompt)
+            return self.generate_content(prompt, deadline, refresh)
+        except Exception as e:
+            logger.error(f"❌ Error in generate_project_description for '{project_name}': {e}")
+            if deadline is not None:
+                deadline.degrade(f"project:{project_name}", f"used default description ({e})")
+            return self.default_project_description(project_name)
+
+    def generate_project_descriptions_batch(self, projects, deadline=None, refresh=False):
+        """Describe several (name, context) projects with one prompt. Returns only the names the model answered."""
+        project_blocks = "\n".join(f'        - **Name**: "{name}"\n          **Context**: "{context}"' for name, context in projects)
+        prompt = f"""
+        Act as an expert technical copywriter for a professional resume. Your task is to write a compelling, results-oriented description for each software project listed below.
+        **CRITICAL INSTRUCTIONS:**
+        1.  **Length:** Each description must be between 3 and 5 lines long.
+        2.  **Content Focus:** Focus on each project's core functionality, the problem it solves, and the value it provides to an end-user. Describe WHAT the application is and what it DOES.
+        3.  **Exclusion Criteria:**
+            - No multiple options or explanations
+            - **Crucially, DO NOT mention specific programming languages** (e.g., Python, JavaScript).
+            - **DO NOT mention specific AI-as-a-service tools** or brand names (e.g., ChatGPT, Lobe.ai, Bolt). Instead, describe the functionality (e.g., "a custom machine learning model for image recognition," "a natural language processing feature").
+            - Mention general technologies (like 'REST API', 'NoSQL database', 'machine learning model') only to support the description of what was built.
+        4.  **Output Format:** Output only a JSON object whose keys are the project names exactly as given and whose values are the descriptions. No markdown, no prefacing text.
+        **Projects to Describe:**
+        ---
+{project_blocks}
+        ---
+        """
+        try:
+            reply = self.generate_content(prompt, deadline, refresh)
         except Exception as e:
-            print(f"❌ Error in generate_project_description for '{project_name}': {e}")
-            return f"A project named '{project_name}' that showcases practical application of technical skills."
+            logger.error(f"❌ Error in generate_project_descriptions_batch: {e}")
+            return {}
+        match = re.search(r'\{.*\}', reply, re.DOTALL)
+        try:
+            parsed = json.loads(match.group(0)) if match else {}
+        except ValueError:
+            parsed = {}
+        if not isinstance(parsed, dict):
+            return {}
+        names = {name for name, _ in projects}
+        return {name: desc.strip() for name, desc in parsed.items() if name in names and isinstance(desc, str) and desc.strip()}
+
+    def generate_project_descriptions(self, projects, on_described=None, deadline=None, refresh=False):
+        """Describe every (name, context) project, returning descriptions in the same order.
+
+        `on_described(index, description)` is called as soon as each description is ready. With a
+        `deadline`, projects still waiting on the model when it runs out get the default description.
+        """
+        descriptions = {}
+        if Config.GEMINI_BATCH_PROJECTS and len(projects) > 1:
+            batch = self.executor.submit(self.generate_project_descriptions_batch, projects, deadline, refresh)
+            descriptions = self._await(batch, deadline, 'projects', {})
+            missing = len({name for name, _ in projects} - descriptions.keys())
+            if missing:
+                logger.warning(f"    > ⚠️ Batched reply missed {missing} project(s); describing them individually...")
+        futures = {name: self.executor.submit(self.generate_project_description, name, context, deadline, refresh) for name, context in projects if name not in descriptions}
+        if on_described:
+            for index, (name, _) in enumerate(projects):
+                if name in descriptions:
+                    on_described(index, descriptions[name])
+                else:
+                    futures[name].add_done_callback(lambda future, index=index: future.cancelled() or on_described(index, future.result()))
+        for name, _ in projects:
+            if name not in descriptions:
+                descriptions[name] = self._await(futures[name], deadline, f"project:{name}", self.default_project_description(name))
+        return [descriptions[name] for name, _ in projects]
+
+    @staticmethod
+    def _await(future, deadline, part, default):
+        """Result of `future`, or `default` if the deadline (less the render reserve) passes first."""
+        if deadline is None:
+            return future.result()
+        try:
+            return future.result(timeout=deadline.remaining(reserve=Config.RENDER_RESERVE))
+        except FutureTimeoutError:
+            future.cancel()
+            deadline.degrade(part, "model did not answer within the generation deadline; used default text")
+            return default
 
     def generate_portfolio_data(self, profile, projects, experiences, education, summary, languages, topics):
         name = profile.get('name') or profile.get('login', 'Unknown')
@@ -283,33 +1176,48 @@ class GeminiService:
             "experience": [{"year": exp.get("date", "Period"), "title": exp.get("jobTitle", "Position"), "description": f"Worked at {exp.get('company', 'Company')}"} for exp in experiences]
         }
 
-    def extract_user_data(self, linkedin_text, github_data, pdf_parser: PDFParser):
-        print("🤖 [4/5] Starting AI Content Generation & Data Compilation...")
-        print("    > Generating resume summary...")
-        generated_summary = self.generate_resume_summary(linkedin_text)
-        print("    > ✅ Summary generated.")
-        
-        experiences, education = pdf_parser.extract_sections(linkedin_text)
-        profile = github_data.get('profile', {})
+    def extract_user_data(self, linkedin_text, github_data, pdf_parser: PDFParser, on_progress=None, deadline=None, summary=None, refresh=False):
+        """Compile the final user data. `on_progress(stage, data)` receives partial results as they finish.
+
+        A known `summary` is reused instead of generated; `refresh` bypasses cached model replies.
+        """
+        on_progress = on_progress or (lambda stage, data: None)
+        logger.info("🤖 [4/5] Starting AI Content Generation & Data Compilation...")
         repos = github_data.get('repositories', [])
-        
-        generated_projects = []
-        for i, repo in enumerate(repos):
-            print(f"    > Generating description for project {i+1}/{len(repos)}: {repo.get('name')}")
+        # The summary and the project prompts are independent; send them all at once
+        # and let the per-key token buckets pace them.
+        logger.info(f"    > Generating resume summary and {len(repos)} project description(s) concurrently...")
+        if summary is not None:
+            summary_future = Future()
+            summary_future.set_result(summary)
+        else:
+            summary_future = self.executor.submit(self.generate_resume_summary, linkedin_text, deadline, refresh)
+        summary_future.add_done_callback(lambda future: future.cancelled() or on_progress('summary', {'summary': future.result()}))
+        project_inputs = []
+        for repo in repos:
             project_title = repo.get('name', 'Untitled').replace('-', ' ').title()
             topics_str = ", ".join(repo.get('topics', []))
             project_context = repo.get('readme') or f"Desc: {repo.get('description', 'N/A')}. Lang: {repo.get('language', 'N/A')}. Topics: {topics_str}"
-            desc = self.generate_project_description(project_title, project_context[:2000])
+            project_inputs.append((project_title, project_context[:2000]))
+
+        sections = pdf_parser.parse_sections(linkedin_text)
+        experiences, education = sections['experience'], sections['education']
+        on_progress('sections_parsed', {'experience': experiences, 'education': education})
+        profile = github_data.get('profile', {})
+
+        descriptions = self.generate_project_descriptions(project_inputs, on_described=lambda index, desc: on_progress('project', {
+            'index': index, 'total': len(project_inputs), 'title': project_inputs[index][0], 'description': desc
+        }), deadline=deadline, refresh=refresh)
+        generated_summary = self._await(summary_future, deadline, 'summary', self.default_summary())
+        logger.info("    > ✅ Summary generated.")
+        generated_projects = []
+        for repo, (project_title, _), desc in zip(repos, project_inputs, descriptions):
             generated_projects.append({
                 "title": project_title, "description": desc,
                 "image": "https://images.pexels.com/photos/196644/pexels-photo-196644.jpeg?auto=compress&cs=tinysrgb&w=400",
                 "link": repo.get('html_url', '#'), "demo": repo.get('html_url', '#'), "github": repo.get('html_url', '#')
             })
-
-            if i < len(repos) - 1:
-                print(f"    > ⏳ Pausing for 1 second...")
-                time.sleep(1)
-        print("🤖 [4/5] ✅ All AI Content Generated.")
+        logger.info("🤖 [4/5] ✅ All AI Content Generated.")
 
         languages = [lang for lang in list(set(r.get('language') for r in repos if r.get('language'))) if lang != "Jupyter Notebook"]
         topics = list(set(topic for repo in repos for topic in repo.get('topics', [])))
@@ -332,64 +1240,1628 @@ class GeminiService:
                 {"category": "Programming Languages", "items": languages or ["JavaScript", "Python"]},
                 {"category": "Technologies", "items": final_techs}
             ],
-            "certifications": [],
+            "certifications": sections['certifications'],
             "portfolio_data": self.generate_portfolio_data(profile, generated_projects, experiences, education, generated_summary, languages, topics)
         }
         
         print_json_data(user_data, "FINAL COMPILED USER DATA")
         return user_data
 
-class TemplateService:
+CompiledTemplate = namedtuple('CompiledTemplate', ['prefix', 'suffix', 'mtime', 'fields'])
+
+RAW_BLOCK = re.compile(r'(<(pre|textarea|script|style)\b[^>]*>.*?</\2\s*>)', re.DOTALL | re.IGNORECASE)
+CSS_STRING = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+
+def _strip_lines(text):
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+def _minify_css(css):
+    # Only the text between string literals is touched, so url()/content values stay intact.
+    parts = CSS_STRING.split(re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL))
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r'\s*([{};,])\s*', r'\1', re.sub(r'\s+', ' ', parts[i]))
+    return ''.join(parts)
+
+def minify_html(html):
+    """Shrink a template without changing how it renders.
+
+    Drops HTML comments, indentation and blank lines, and CSS comments and whitespace. Scripts only
+    lose indentation and blank lines (no ASI or regex-literal pitfalls); <pre> and <textarea> are kept as-is.
+    """
+    out = []
+    for i, part in enumerate(RAW_BLOCK.split(html)):
+        kind = i % 3
+        if kind == 2:
+            continue  # tag name captured by the block pattern
+        if kind == 0:
+            out.append(_strip_lines(re.sub(r'<!--(?!\[if).*?-->', '', part, flags=re.DOTALL)))
+            continue
+        tag = part[1:part.index('>')].split()[0].lower().rstrip('>')
+        if tag == 'style':
+            open_end, close_start = part.index('>') + 1, part.lower().rindex('</style')
+            out.append(part[:open_end] + _minify_css(part[open_end:close_start]) + part[close_start:])
+        elif tag == 'script':
+            out.append(_strip_lines(part))
+        else:
+            out.append(part)
+    return "\n".join(piece for piece in out if piece)
+
+def template_fields(html, entry_point):
+    """Top-level data keys a template reads, found by following the argument of `entry_point` through the script.
+
+    Returns None (embed everything) when the data object is used in a way this cannot follow,
+    e.g. passed to an unknown function, spread, or indexed dynamically.
+    """
+    match = re.search(rf'function\s+{entry_point}\s*\(\s*(\w+)\s*\)', html)
+    if not match:
+        return None
+    functions = dict(re.findall(r'function\s+(\w+)\s*\(\s*(\w+)\s*\)', html))
+    names, pending, fields = set(), [match.group(1)], set()
+    while pending:
+        name = pending.pop()
+        if name in names:
+            continue
+        names.add(name)
+        fields.update(re.findall(rf'\b{name}\??\.(\w+)', html))
+        if re.search(rf'\b{name}\s*\[|\.\.\.{name}\b|[=:,(]\s*{name}\s*[;,}}\]]|,\s*{name}\s*\)|\bin\s+{name}\b', html):
+            return None
+        for callee in re.findall(rf'(?<![\w.])(\w+)\(\s*{name}\s*\)', html):
+            if callee not in functions:
+                return None
+            pending.append(functions[callee])
+    return frozenset(fields)
+
+# --- Server-side Rendering ---
+# Python ports of each template's renderResume/renderPortfolio. They make the same DOM writes as
+# the template scripts, by element id, so documents can be served as final static markup.
+
+class _JSMissing:
+    """JavaScript's undefined/null: falsy, printed by name in template literals, and an error to index."""
+    def __init__(self, name):
+        self.name = name
+
+    def __bool__(self):
+        return False
+
+    def __str__(self):
+        return self.name
+
+    def __format__(self, spec):
+        return self.name
+
+    def __getitem__(self, key):
+        raise TypeError(f"Cannot read properties of {self.name} (reading '{key}')")
+
+UNDEFINED, NULL = _JSMissing('undefined'), _JSMissing('null')
+
+class JSObject:
+    """A JSON object read the way the template scripts read it: missing keys are undefined, and it is always truthy."""
+    __slots__ = ('values',)
+
+    def __init__(self, values):
+        self.values = values
+
+    def __getitem__(self, key):
+        return js_value(self.values.get(key, UNDEFINED))
+
+    def __bool__(self):
+        return True
+
+    def __str__(self):
+        return '[object Object]'
+
+    def __format__(self, spec):
+        return str(self)
+
+class JSArray(list):
+    """A JSON array that is truthy when empty and prints like Array.prototype.join(',')."""
+    def __bool__(self):
+        return True
+
+    def join(self, separator=','):
+        return separator.join('' if item is NULL or item is UNDEFINED else str(item) for item in self)
+
+    def __str__(self):
+        return self.join()
+
+    def __format__(self, spec):
+        return str(self)
+
+class _JSBool:
+    def __init__(self, value):
+        self.value = value
+
+    def __bool__(self):
+        return self.value
+
+    def __str__(self):
+        return 'true' if self.value else 'false'
+
+    def __format__(self, spec):
+        return str(self)
+
+def js_value(value):
+    if isinstance(value, dict):
+        return JSObject(value)
+    if isinstance(value, list):
+        return JSArray(js_value(item) for item in value)
+    if value is None:
+        return NULL
+    if isinstance(value, bool):
+        return _JSBool(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _nonempty(value):
+    """`value && value.length > 0`"""
+    return bool(value) and isinstance(value, (JSArray, str)) and len(value) > 0
+
+PageElement = namedtuple('PageElement', ['start', 'content_start', 'content_end'])
+
+class _ElementLocator(HTMLParser):
+    VOID_ELEMENTS = frozenset(('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'))
+
+    def __init__(self, markup):
+        super().__init__(convert_charrefs=False)
+        self.line_starts = [0] + [match.end() for match in re.finditer('\n', markup)]
+        self.open_elements = []
+        self.elements = {}
+        self.feed(markup)
+        self.close()
+
+    def _offset(self):
+        line, column = self.getpos()
+        return self.line_starts[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        start = self._offset()
+        content_start = start + len(self.get_starttag_text())
+        element_id = dict(attrs).get('id')
+        if tag in self.VOID_ELEMENTS:
+            if element_id:
+                self.elements.setdefault(element_id, PageElement(start, content_start, None))
+            return
+        self.open_elements.append((tag, element_id, start, content_start))
+
+    def handle_startendtag(self, tag, attrs):
+        start = self._offset()
+        element_id = dict(attrs).get('id')
+        if element_id:
+            self.elements.setdefault(element_id, PageElement(start, start + len(self.get_starttag_text()), None))
+
+    def handle_endtag(self, tag):
+        end = self._offset()
+        for i in range(len(self.open_elements) - 1, -1, -1):
+            if self.open_elements[i][0] == tag:
+                # Anything left open inside is closed here too, as a browser would.
+                for _, element_id, start, content_start in self.open_elements[i:]:
+                    if element_id:
+                        self.elements.setdefault(element_id, PageElement(start, content_start, end))
+                del self.open_elements[i:]
+                return
+
+class _ElementPatch:
+    ATTRIBUTE = r'(\s{name})(?:\s*=\s*("[^"]*"|\'[^\']*\'|[^\s"\'>]+))?(?=[\s/>])'
+
     def __init__(self):
+        self.content = None
+        self.classes = []
+        self.attributes = {}
+
+    def _attribute(self, name):
+        return re.compile(self.ATTRIBUTE.format(name=re.escape(name)), re.IGNORECASE)
+
+    def _set_attribute(self, tag, name, value):
+        quoted = '"' + html.escape(value, quote=True) + '"'
+        pattern = self._attribute(name)
+        if pattern.search(tag):
+            return pattern.sub(lambda match: f"{match.group(1)}={quoted}", tag, count=1)
+        end = len(tag) - (2 if tag.endswith('/>') else 1)
+        return f"{tag[:end].rstrip()} {name}={quoted}{tag[end:]}"
+
+    def apply_to_tag(self, tag):
+        for name, value in self.attributes.items():
+            tag = self._set_attribute(tag, name, value)
+        if self.classes:
+            match = self._attribute('class').search(tag)
+            current = html.unescape((match.group(2) or '').strip('"\'')).split() if match else []
+            classes = list(current)
+            for add, name in self.classes:
+                if add and name not in classes:
+                    classes.append(name)
+                elif not add:
+                    classes = [existing for existing in classes if existing != name]
+            if classes != current:
+                tag = self._set_attribute(tag, 'class', ' '.join(classes))
+        return tag
+
+class PagePatch:
+    """The DOM writes of one render, per element id: content (textContent/innerHTML), classList and attribute changes."""
+    def __init__(self):
+        self.elements = {}
+
+    def _element(self, element_id):
+        return self.elements.setdefault(element_id, _ElementPatch())
+
+    def text(self, element_id, value):
+        self._element(element_id).content = html.escape('' if value is NULL else str(value), quote=False)
+
+    def html(self, element_id, markup):
+        self._element(element_id).content = '' if markup is NULL else str(markup)
+
+    def add_class(self, element_id, name):
+        self._element(element_id).classes.append((True, name))
+
+    def remove_class(self, element_id, name):
+        self._element(element_id).classes.append((False, name))
+
+    def set_attribute(self, element_id, name, value):
+        self._element(element_id).attributes[name] = str(value)
+
+class StaticPage:
+    """A template's markup with every element carrying an id located once, so applying a PagePatch is a few splices."""
+    def __init__(self, markup):
+        self.markup = markup
+        self.elements = _ElementLocator(markup).elements
+
+    def render(self, patch):
+        splices = []
+        for element_id, element_patch in patch.elements.items():
+            element = self.elements.get(element_id)
+            if element is None:
+                raise KeyError(f"Template has no element #{element_id}")
+            tag = self.markup[element.start:element.content_start]
+            new_tag = element_patch.apply_to_tag(tag)
+            if new_tag != tag:
+                splices.append((element.start, element.content_start, new_tag))
+            if element_patch.content is not None:
+                if element.content_end is None:
+                    raise ValueError(f"#{element_id} is a void element and cannot have content")
+                splices.append((element.content_start, element.content_end, element_patch.content))
+        splices.sort()
+        parts, position = [], 0
+        for start, end, text in splices:
+            if start < position:
+                raise ValueError("Patched elements overlap; write the outer element's final markup instead")
+            parts.append(self.markup[position:start])
+            parts.append(text)
+            position = end
+        parts.append(self.markup[position:])
+        return ''.join(parts)
+
+def _bullets(description):
+    if isinstance(description, JSArray):
+        return description
+    return [line for line in description.split('\n') if line.strip()] if description else []
+
+def _strip_bullet(bullet):
+    return re.sub(r'^[•\-*]\s*', '', str(bullet), count=1)
+
+def _bullet_items(bullets):
+    return ''.join(f"<li>{_strip_bullet(bullet)}</li>" for bullet in bullets)
+
+def _clean_date(date):
+    return re.sub(r'\)\Z', '', re.sub(r'^\s*·\s*\(', '', date or '', count=1), count=1).strip()
+
+def _company_with_location(exp):
+    company, location = exp['company'] or '', exp['location'] or ''
+    return f"{company}, {location}" if location else company
+
+def _list_section(page, section_id, list_id, items, render_item):
+    """The resume templates' section pattern: hide the section without items, else render every item into the list."""
+    if not _nonempty(items):
+        page.add_class(section_id, 'hidden')
+        return
+    page.remove_class(section_id, 'hidden')
+    page.html(list_id, ''.join(render_item(item) for item in items))
+
+def _find_category(skills, name):
+    if skills and isinstance(skills, JSArray):
+        return next((category for category in skills if category['category'] == name), UNDEFINED)
+    return UNDEFINED
+
+def _prerender_resume1(page, data):
+    page.text('userName', data['name'] or '')
+    page.text('userTitle', data['title'] or '')
+    page.text('userSummary', data['summary'] or '')
+    contact = data['contact']
+    if contact:
+        icons = (('email', '📧'), ('phone', '📱'), ('location', '📍'), ('linkedin', '💼'), ('website', '🌐'), ('github', '🔗'))
+        page.html('contactInfo', ''.join(f'<div class="contact-item">{icon} {contact[key]}</div>' for key, icon in icons if contact[key]))
+
+    def experience(exp):
+        bullets = _bullets(exp['description'])
+        date = f'<div class="job-date">{exp["date"]}</div>' if exp['date'] else ''
+        description = f"""
+                        <div class="job-description">
+                            <ul>
+                                {_bullet_items(bullets)}
+                            </ul>
+                        </div>
+                        """ if bullets else ''
+        return f"""
+                    <div class="experience-item">
+                        <div class="job-header">
+                            <div>
+                                <div class="job-title">{exp['jobTitle'] or ''}</div>
+                                <div class="company-name">{_company_with_location(exp)}</div>
+                            </div>
+                            {date}
+                        </div>
+                        {description}
+                    </div>
+                """
+
+    def project(proj):
+        bullets = _bullets(proj['description'])
+        tech = f'<div class="project-tech">Technologies: {proj["technologies"]}</div>' if proj['technologies'] else ''
+        date = f'<div class="project-date">{proj["date"]}</div>' if proj['date'] else ''
+        summary = f'<p>{proj["summary"]}</p>' if proj['summary'] else ''
+        items = f"""
+                            <ul>
+                                {_bullet_items(bullets)}
+                            </ul>
+                            """ if bullets else ''
+        return f"""
+                    <div class="projects-item">
+                        <div class="project-header">
+                            <div>
+                                <div class="project-title">{proj['title'] or ''}</div>
+                                {tech}
+                            </div>
+                            {date}
+                        </div>
+                        <div class="project-description">
+                            {summary}
+                            {items}
+                        </div>
+                    </div>
+                """
+
+    def education(edu):
+        details = f'<div class="education-details">{edu["details"]}</div>' if edu['details'] else ''
+        return f"""
+                    <div class="education-item">
+                        <div class="education-header">
+                            <div>
+                                <div class="degree">{edu['degree'] or ''}</div>
+                                <div class="school">{edu['school'] or ''}</div>
+                                {details}
+                            </div>
+                            <div class="education-date">{_clean_date(edu['date'])}</div>
+                        </div>
+                    </div>
+                """
+
+    def skill_group(group):
+        items = group['items'].join(', ') if isinstance(group['items'], JSArray) else group['items'] or ''
+        return f"""
+                    <div class="skill-category">
+                        <div class="skill-category-title">{group['category'] or ''}:</div>
+                        <div class="skill-items">{items}</div>
+                    </div>
+                """
+
+    def certification(cert):
+        return f"""
+                    <div class="cert-item">
+                        <span class="cert-name">{cert['name'] or ''}</span>
+                        <span class="cert-date">{cert['date'] or ''}</span>
+                    </div>
+                """
+
+    _list_section(page, 'experienceSection', 'experienceList', data['experience'], experience)
+    _list_section(page, 'projectsSection', 'projectsList', data['projects'], project)
+    _list_section(page, 'educationSection', 'educationList', data['education'], education)
+    _list_section(page, 'skillsSection', 'skillsList', data['skills'], skill_group)
+    _list_section(page, 'certificationsSection', 'certificationsList', data['certifications'], certification)
+
+def _prerender_resume2(page, data):
+    page.text('userName', data['name'] or '')
+    page.text('userTitle', data['title'] or '')
+    page.text('userSummary', data['summary'] or '')
+    contact = data['contact']
+    if contact:
+        rows = ''
+        for (left, left_label), (right, right_label) in ((('address', ''), ('phone', 'Phone: ')), (('email', 'Email: '), ('linkedin', 'LinkedIn: ')),
+                                                          (('website', 'Website: '), ('github', 'GitHub: '))):
+            if contact[left] or contact[right]:
+                left_text = (contact[left] or '') if left == 'address' else (f"{left_label}{contact[left]}" if contact[left] else '')
+                right_text = f"{right_label}{contact[right]}" if contact[right] else ''
+                rows += f'<div class="contact-row"><span>{left_text}</span><span>{right_text}</span></div>'
+        page.html('contactInfo', rows)
+
+    def responsibilities(bullets):
+        return f"""
+                        <div class="responsibilities">
+                            <ul>
+                                {_bullet_items(bullets)}
+                            </ul>
+                        </div>
+                        """ if bullets else ''
+
+    def experience(exp):
+        return f"""
+                    <div class="experience-item">
+                        <div class="job-info">{exp['jobTitle'] or ''}</div>
+                        <div class="company-location">{_company_with_location(exp)}</div>
+                        <div class="job-dates">{exp['date'] or ''}</div>
+                        {responsibilities(_bullets(exp['description']))}
+                    </div>
+                """
+
+    def project(proj):
+        tech = f'<div class="project-tech">Technologies: {proj["technologies"]}</div>' if proj['technologies'] else ''
+        date = f'<div class="project-dates">{proj["date"]}</div>' if proj['date'] else ''
+        summary = f'<div class="project-summary">{proj["summary"]}</div>' if proj['summary'] else ''
+        return f"""
+                    <div class="projects-item">
+                        <div class="project-info">{proj['title'] or ''}</div>
+                        {tech}
+                        {date}
+                        {summary}
+                        {responsibilities(_bullets(proj['description']))}
+                    </div>
+                """
+
+    def education(edu):
+        location = ', ' + str(edu['location']) if edu['location'] else ''
+        details = f'<div class="education-details">{edu["details"]}</div>' if edu['details'] else ''
+        return f"""
+                    <div class="education-item">
+                        <div class="degree-info">{edu['degree'] or ''}</div>
+                        <div class="school-info">{edu['school'] or ''}{location}</div>
+                        <div class="education-dates">{_clean_date(edu['date'])}</div>
+                        {details}
+                    </div>
+                """
+
+    def skill_group(group):
+        items = group['items']
+        skills = items if isinstance(items, JSArray) else [skill.strip() for skill in items.split(',')] if items else []
+        return f"""
+                    <div class="skill-group">
+                        <div class="skill-title">{group['category'] or ''}:</div>
+                        <ul class="skill-list">
+                            {''.join(f'<li>{skill}</li>' for skill in skills)}
+                        </ul>
+                    </div>
+                """
+
+    def certification(cert):
+        return f"""
+                    <li>
+                        <span class="cert-name">{cert['name'] or ''}</span>
+                        <span class="cert-date">{cert['date'] or ''}</span>
+                    </li>
+                """
+
+    def language(lang):
+        if isinstance(lang, str):
+            return f"<li>{lang}</li>"
+        proficiency = '(' + str(lang['proficiency']) + ')' if lang['proficiency'] else ''
+        return f"<li>{lang['language'] or ''} {proficiency}</li>"
+
+    _list_section(page, 'experienceSection', 'experienceList', data['experience'], experience)
+    _list_section(page, 'projectsSection', 'projectsList', data['projects'], project)
+    _list_section(page, 'educationSection', 'educationList', data['education'], education)
+    _list_section(page, 'skillsSection', 'skillsList', data['skills'], skill_group)
+    _list_section(page, 'certificationsSection', 'certificationsList', data['certifications'], certification)
+    _list_section(page, 'languagesSection', 'languagesList', data['languages'], language)
+
+def _prerender_resume3(page, data):
+    page.text('userName', data['name'] or '')
+    contact = data['contact']
+    if contact:
+        lines = ''
+        if contact['address']:
+            lines += f'<div class="contact-line">{contact["address"]}</div>'
+        phone_email = [f"{label}{contact[key]}" for key, label in (('phone', 'Phone: '), ('email', 'Email: ')) if contact[key]]
+        if phone_email:
+            lines += f'<div class="contact-line">{" | ".join(phone_email)}</div>'
+        links = [f"{label}{contact[key]}" for key, label in (('linkedin', 'LinkedIn: '), ('website', 'Portfolio: '), ('github', 'GitHub: ')) if contact[key]]
+        if links:
+            lines += f'<div class="contact-line">{" | ".join(links)}</div>'
+        page.html('contactInfo', lines)
+    if data['objective']:
+        page.text('userObjective', data['objective'])
+        page.remove_class('objectiveSection', 'hidden')
+        page.add_class('summarySection', 'hidden')
+    elif data['summary']:
+        page.text('userSummary', data['summary'])
+        page.remove_class('summarySection', 'hidden')
+        page.add_class('objectiveSection', 'hidden')
+    else:
+        page.add_class('objectiveSection', 'hidden')
+        page.add_class('summarySection', 'hidden')
+
+    def description(bullets, css_class):
+        return f"""
+                        <div class="{css_class}">
+                            <ul>
+                                {_bullet_items(bullets)}
+                            </ul>
+                        </div>
+                        """ if bullets else ''
+
+    def experience(exp):
+        return f"""
+                    <div class="experience-item">
+                        <div class="job-header">
+                            <div class="job-title">{exp['jobTitle'] or ''}</div>
+                            <div class="job-date">{exp['date'] or ''}</div>
+                        </div>
+                        <div class="company-name">{_company_with_location(exp)}</div>
+                        {description(_bullets(exp['description']), 'job-description')}
+                    </div>
+                """
+
+    def project(proj):
+        tech = f'<div class="project-tech">Technologies: {proj["technologies"]}</div>' if proj['technologies'] else ''
+        date = f'<div class="job-date">{proj["date"]}</div>' if proj['date'] else ''
+        summary = f'<div style="margin-bottom: 8px; font-style: italic;">{proj["summary"]}</div>' if proj['summary'] else ''
+        return f"""
+                    <div class="projects-item">
+                        <div class="project-header">
+                            <div>
+                                <div class="project-title">{proj['title'] or ''}</div>
+                                {tech}
+                            </div>
+                            {date}
+                        </div>
+                        {summary}
+                        {description(_bullets(proj['description']), 'project-description')}
+                    </div>
+                """
+
+    def education(edu):
+        location = ', ' + str(edu['location']) if edu['location'] else ''
+        details = f'<div class="education-details">{edu["details"]}</div>' if edu['details'] else ''
+        return f"""
+                    <div class="education-item">
+                        <div class="education-header">
+                            <div>
+                                <div class="degree">{edu['degree'] or ''}</div>
+                                <div class="school">{edu['school'] or ''}{location}</div>
+                            </div>
+                            <div class="job-date">{_clean_date(edu['date'])}</div>
+                        </div>
+                        {details}
+                    </div>
+                """
+
+    def skill_group(group):
+        items = group['items'].join(', ') if isinstance(group['items'], JSArray) else group['items'] or ''
+        return f"""
+                    <div class="skill-category">
+                        <div class="skill-category-title">{group['category'] or ''}:</div>
+                        <div>{items}</div>
+                    </div>
+                """
+
+    def certification(cert):
+        details = f'<div class="cert-details">{cert["details"]}</div>' if cert['details'] else ''
+        return f"""
+                    <div class="certification-item">
+                        <div class="certification-header">
+                            <div class="cert-name">{cert['name'] or ''}</div>
+                            <div class="job-date">{cert['date'] or ''}</div>
+                        </div>
+                        {details}
+                    </div>
+                """
+
+    _list_section(page, 'experienceSection', 'experienceList', data['experience'], experience)
+    _list_section(page, 'projectsSection', 'projectsList', data['projects'], project)
+    _list_section(page, 'educationSection', 'educationList', data['education'], education)
+    _list_section(page, 'skillsSection', 'skillsList', data['skills'], skill_group)
+    _list_section(page, 'certificationsSection', 'certificationsList', data['certifications'], certification)
+
+def _prerender_resume4(page, data):
+    page.text('userName', data['name'] or '')
+    page.text('userTitle', data['title'] or '')
+    photo = data['photo']
+    page.html('profilePhoto', f'<img src="{photo}" alt="Profile Photo" />' if photo else '👤')
+    contact = data['contact']
+    if not contact:
+        page.add_class('contactSection', 'hidden')
+    else:
+        page.remove_class('contactSection', 'hidden')
+        icons = (('email', '📧'), ('phone', '📱'), ('location', '📍'), ('linkedin', '💼'), ('website', '🌐'), ('github', '🔗'))
+        page.html('contactList', ''.join(f"""
+                    <div class="contact-item">
+                        <span class="contact-icon">{icon}</span>
+                        <span>{contact[key]}</span>
+                    </div>
+                """ for key, icon in icons if contact[key]))
+    if data['summary'] or data['objective']:
+        page.text('summaryTitle', 'Professional Summary' if data['summary'] else 'Objective')
+        page.text('summaryText', data['summary'] or data['objective'])
+        page.remove_class('summarySection', 'hidden')
+    else:
+        page.add_class('summarySection', 'hidden')
+
+    def skill_bar(name, level):
+        return f"""
+                    <div class="skill-item">
+                        <div class="skill-name">{name}</div>
+                        <div class="skill-bar">
+                            <div class="skill-progress" style="width: {level}%;"></div>
+                        </div>
+                    </div>
+                """
+
+    tech = _find_category(data['skills'], 'Technologies')
+    skills = tech['items'] if tech and isinstance(tech['items'], JSArray) else []
+    if not skills:
+        page.add_class('skillsSection', 'hidden')
+    else:
+        page.remove_class('skillsSection', 'hidden')
+        page.html('skillsList', ''.join(
+            skill_bar(skill, 75) if isinstance(skill, str) else skill_bar(skill['name'] or skill, skill['level'] or 75 if isinstance(skill, (JSObject, JSArray)) else 75)
+            for skill in skills))
+
+    def language(lang):
+        if not isinstance(lang, str):
+            return skill_bar(lang['name'], lang['level'] or 75)
+        level = 100 if 'Native' in lang else 90 if 'Fluent' in lang else 60 if 'Conversational' in lang else 75
+        return skill_bar(lang.split(' (')[0], level)
+
+    _list_section(page, 'languagesSection', 'languagesList', data['languages'], language)
+
+    def description(bullets):
+        return f"""
+                        <div class="job-description">
+                            <ul>
+                                {_bullet_items(bullets)}
+                            </ul>
+                        </div>
+                        """ if bullets else ''
+
+    def experience(exp):
+        return f"""
+                    <div class="timeline-item">
+                        <div class="position-title">{exp['jobTitle'] or ''}</div>
+                        <div class="company-name">{_company_with_location(exp)}</div>
+                        <div class="timeline-date">{exp['date'] or ''}</div>
+                        {description(_bullets(exp['description']))}
+                    </div>
+                """
+
+    def project(proj):
+        tech = f'<div class="project-tech">Technologies: {proj["technologies"]}</div>' if proj['technologies'] else ''
+        date = f'<div class="timeline-date">{proj["date"]}</div>' if proj['date'] else ''
+        summary = f'<div class="project-summary">{proj["summary"]}</div>' if proj['summary'] else ''
+        return f"""
+                    <div class="project-item">
+                        <div class="project-title">{proj['title'] or ''}</div>
+                        {tech}
+                        {date}
+                        {summary}
+                        {description(_bullets(proj['description']))}
+                    </div>
+                """
+
+    def education(edu):
+        details = f'<div class="education-details">{edu["details"]}</div>' if edu['details'] else ''
+        return f"""
+                    <div class="education-item">
+                        <div class="degree">{edu['degree'] or ''}</div>
+                        <div class="institution">{edu['school'] or ''}</div>
+                        <div class="education-date">{_clean_date(edu['date'])}</div>
+                        {details}
+                    </div>
+                """
+
+    def certification(cert):
+        details = f'<div class="education-details">{cert["details"]}</div>' if cert['details'] else ''
+        return f"""
+                    <div class="certification-item">
+                        <div class="degree">{cert['name'] or ''}</div>
+                        <div class="education-date">{cert['date'] or ''}</div>
+                        {details}
+                    </div>
+                """
+
+    _list_section(page, 'experienceSection', 'experienceList', data['experience'], experience)
+    _list_section(page, 'projectsSection', 'projectsList', data['projects'], project)
+    _list_section(page, 'educationSection', 'educationList', data['education'], education)
+    _list_section(page, 'certificationsSection', 'certificationsList', data['certifications'], certification)
+
+def _prerender_resume5(page, data):
+    page.text('userName', data['name'] or '')
+    page.text('userTitle', data['title'] or '')
+    contact = data['contact']
+    if contact:
+        icons = (('email', '📧'), ('phone', '📱'), ('location', '📍'), ('linkedin', '💼'), ('github', '🔗'), ('website', '🌐'))
+        page.html('contactInfo', ''.join(f'<div class="contact-item">{icon} {contact[key]}</div>' for key, icon in icons if contact[key]))
+    if data['summary']:
+        page.text('userSummary', data['summary'])
+        page.remove_class('summarySection', 'hidden')
+        page.add_class('objectiveSection', 'hidden')
+    elif data['objective']:
+        page.text('userObjective', data['objective'])
+        page.remove_class('objectiveSection', 'hidden')
+        page.add_class('summarySection', 'hidden')
+    else:
+        page.add_class('summarySection', 'hidden')
+        page.add_class('objectiveSection', 'hidden')
+
+    def bullet_points(bullets):
+        return f"""
+                        <ul class="bullet-points">
+                            {_bullet_items(bullets)}
+                        </ul>
+                        """ if bullets else ''
+
+    def experience(exp):
+        return f"""
+                    <div class="experience-item">
+                        <div class="job-title">{exp['jobTitle'] or ''}</div>
+                        <div class="company">{_company_with_location(exp)}</div>
+                        <div class="date">{exp['date'] or ''}</div>
+                        {bullet_points(_bullets(exp['description']))}
+                    </div>
+                """
+
+    def project(proj):
+        tech = f'<div class="project-tech">Technologies: {proj["technologies"]}</div>' if proj['technologies'] else ''
+        date = f'<div class="date">{proj["date"]}</div>' if proj['date'] else ''
+        summary = f'<div class="project-summary">{proj["summary"]}</div>' if proj['summary'] else ''
+        return f"""
+                    <div class="project-item">
+                        <div class="project-title">{proj['title'] or ''}</div>
+                        {tech}
+                        {date}
+                        {summary}
+                        {bullet_points(_bullets(proj['description']))}
+                    </div>
+                """
+
+    def education(edu):
+        details = f'<div class="description">{edu["details"]}</div>' if edu['details'] else ''
+        return f"""
+                    <div class="education-item">
+                        <div class="degree">{edu['degree'] or ''}</div>
+                        <div class="school">{edu['school'] or ''}</div>
+                        <div class="date">{_clean_date(edu['date'])}</div>
+                        {details}
+                    </div>
+                """
+
+    def certification(cert):
+        details = f'<div class="description">{cert["details"]}</div>' if cert['details'] else ''
+        return f"""
+                    <div class="certification-item">
+                        <div class="degree">{cert['name'] or ''}</div>
+                        <div class="date">{cert['date'] or ''}</div>
+                        {details}
+                    </div>
+                """
+
+    _list_section(page, 'experienceSection', 'experienceList', data['experience'], experience)
+    _list_section(page, 'projectsSection', 'projectsList', data['projects'], project)
+    _list_section(page, 'educationSection', 'educationList', data['education'], education)
+    skills = []
+    for category in ('Technologies', 'Programming Languages'):
+        found = _find_category(data['skills'], category)
+        if found and isinstance(found['items'], JSArray) and len(found['items']) > 0:
+            skills = found['items']
+            break
+    if not skills:
+        page.add_class('skillsSection', 'hidden')
+    else:
+        page.remove_class('skillsSection', 'hidden')
+        page.html('skillsList', ''.join(f'<div class="skill-tag">{skill if isinstance(skill, str) else skill["name"] or skill}</div>' for skill in skills))
+    _list_section(page, 'certificationsSection', 'certificationsList', data['certifications'], certification)
+
+def _prerender_portfolio1(page, data):
+    icons = {'linkedin': 'uil-linkedin-alt', 'github': 'uil-github-alt', 'twitter': 'uil-twitter-alt',
+             'facebook': 'uil-facebook-f', 'instagram': 'uil-instagram', 'dribbble': 'uil-dribbble'}
+    icon = lambda platform: icons.get(str(platform).lower(), 'uil-link')
+    page.text('pageTitle', f"{data['name']} - Portfolio")
+    page.text('navLogo', data['name'])
+
+    home = data['home']
+    if home:
+        page.text('homeTitle', home['title'] or "Hi, I'm Patrick")
+        page.text('homeSubtitle', home['subtitle'] or "Frontend developer")
+        page.text('homeDescription', home['description'] or "High level experience in web design and development knowledge, producing quality work.")
+        if home['image']:
+            page.set_attribute('homeImage', 'href', home['image'])
+        if _nonempty(home['socialLinks']):
+            page.html('homeSocial', ''.join(f"""
+                        <a href="{link['url']}" target="_blank" class="home__social-icon">
+                            <i class="uil {icon(link['platform'])}"></i>
+                        </a>
+                    """ for link in home['socialLinks']))
+
+    about = data['about']
+    if about:
+        if about['title']:
+            page.text('aboutSectionTitle', about['title'])
+        if about['subtitle']:
+            page.text('aboutSectionSubtitle', about['subtitle'])
+        if about['description']:
+            page.text('aboutDescription', about['description'])
+        if about['image']:
+            page.set_attribute('aboutImage', 'src', about['image'])
+        if about['cvUrl']:
+            page.set_attribute('cvButton', 'href', about['cvUrl'])
+        if _nonempty(about['info']):
+            page.html('aboutInfo', ''.join(f"""
+                        <div>
+                            <span class="about__info-title">{item['title']}</span>
+                            <span class="about__info-name">{item['name']}</span>
+                        </div>
+                    """ for item in about['info']))
+
+    skills = data['skills']
+    if _nonempty(skills):
+        html_parts = []
+        for index, category in enumerate(skills):
+            items = ''.join(f"""
+                    <div class="skills__data">
+                        <div class="skills__titles">
+                            <h3 class="skills__name">{skill['name'] or ''}</h3>
+                            <span class="skills__number">{skill['level'] or 0}%</span>
+                        </div>
+                        <div class="skills__bar">
+                            <span class="skills__percentage" style="width: {skill['level'] or 0}%;"></span>
+                        </div>
+                    </div>
+                """ for skill in category['items']) if _nonempty(category['items']) else ''
+            html_parts.append(f"""
+            <div>
+                <div class="skills__content {'skills__open' if index == 0 else 'skills__close'}">
+                    <div class="skills__header">
+                        <i class="uil {category['icon'] or 'uil-brackets-curly'} skills__icon"></i>
+                        <div>
+                            <h1 class="skills__title">{category['title'] or ''}</h1>
+                            <span class="skills__subtitle">{category['subtitle'] or ''}</span>
+                        </div>
+                        <i class="uil uil-angle-down skills__arrow"></i>
+                    </div>
+                    <div class="skills__list grid">
+        {items}
+                    </div>
+                </div>
+            </div>
+        """)
+        page.html('skillsContainer', ''.join(html_parts))
+
+    qualification = data['qualification']
+    if not qualification or (not qualification['education'] and not qualification['experience']):
+        page.add_class('qualificationSection', 'hidden')
+    else:
+        def timeline(entries):
+            rows = ''
+            for index, entry in enumerate(entries):
+                line = '<span class="qualification__line"></span>' if index < len(entries) - 1 else ''
+                details = f"""<div>
+                            <h3 class="qualification__title">{entry['title'] or ''}</h3>
+                            <span class="qualification__subtitle">{entry['subtitle'] or ''}</span>
+                            <div class="qualification__calendar">
+                                <i class="uil uil-calendar-alt"></i>
+                                {entry['date'] or ''}
+                            </div>
+                        </div>"""
+                rounder = f"""<div>
+                            <span class="qualification__rounder"></span>
+                            {line}
+                        </div>"""
+                columns = f"{details}\n{rounder}" if index % 2 == 0 else f"<div></div>\n{rounder}\n{details}"
+                rows += f"""
+                    <div class="qualification__data">
+                        {columns}
+                    </div>
+                """
+            return rows
+
+        has_education, has_experience = _nonempty(qualification['education']), _nonempty(qualification['experience'])
+        tabs = sections = ''
+        if has_education:
+            tabs += """
+            <div class="qualification__button button--flex qualification__active" data-target="#education">
+                <i class="uil uil-graduation-cap qualification__icon"></i>
+                Education
+            </div>
+        """
+            sections += f"""
+            <div class="qualification__content qualification__active" data-content id="education">
+        {timeline(qualification['education'])}</div>"""
+        if has_experience:
+            active = 'qualification__active' if not has_education else ''
+            tabs += f"""
+            <div class="qualification__button button--flex {active}" data-target="#work">
+                <i class="uil uil-briefcase-alt qualification__icon"></i>
+                Work
+            </div>
+        """
+            sections += f"""
+            <div class="qualification__content {active}" data-content id="work">
+        {timeline(qualification['experience'])}</div>"""
+        page.html('qualificationTabs', tabs)
+        page.html('qualificationSections', sections)
+
+    services = data['services']
+    if not _nonempty(services):
+        page.add_class('services', 'hidden')
+        page.add_class('servicesNavItem', 'hidden')
+    else:
+        page.html('servicesContainer', ''.join(f"""
+                    <div class="services__content">
+                        <div>
+                            <i class="uil {service['icon']} services__icon"></i>
+                            <h3 class="services__title">{service['title']}</h3>
+                        </div>
+
+                        <span class="button button--flex button--small button--link services__button">
+                            View More
+                            <i class="uil uil-arrow-right button__icon"></i>
+                        </span>
+
+                        <div class="services__modal">
+                            <div class="services__modal-content">
+                                <h4 class="services__modal-title">{service['title']}</h4>
+                                <i class="uil uil-times services__modal-close"></i>
+
+                                <ul class="services__modal-services grid">
+                {''.join(f'''
+                            <li class="services__modal-service">
+                                <i class="uil uil-check-circle services__modal-icon"></i>
+                                <p>{feature}</p>
+                            </li>
+                        ''' for feature in service['features']) if service['features'] else ''}
+                                </ul>
+                            </div>
+                        </div>
+                    </div>
+                """ for service in services))
+
+    projects = data['portfolio']
+    if _nonempty(projects):
+        page.html('portfolioContainer', '<div>' + ''.join(f"""
+                    <div class="portfolio__content grid">
+                        <img src="{project['image']}" alt="{project['title']}" class="portfolio__img">
+
+                        <div class="portfolio__data">
+                            <h3 class="portfolio__title">{project['title']}</h3>
+                            <p class="portfolio__description">{project['description']}</p>
+                            <a href="{project['link'] or '#'}" class="button button--flex button--small portfolio__button">
+                                Demo
+                                <i class="uil uil-arrow-right button__icon"></i>
+                            </a>
+                        </div>
+                    </div>
+                """ for project in projects) + '</div>')
+
+    cta = data['callToAction']
+    if cta:
+        if cta['title']:
+            page.text('ctaTitle', cta['title'])
+        if cta['description']:
+            page.text('ctaDescription', cta['description'])
+        if cta['image']:
+            page.set_attribute('ctaImage', 'src', cta['image'])
+
+    contact = data['contact']
+    if contact:
+        blocks = (('phone', 'uil-phone', 'Call Me'), ('email', 'uil-envelope', 'Email'), ('location', 'uil-map-marker', 'Location'))
+        page.html('contactInformation', ''.join(f"""
+                    <div class="contact__information">
+                        <i class="uil {css_icon} contact__icon"></i>
+                        <div>
+                            <h3 class="contact__title">{title}</h3>
+                            <span class="contact__subtitle">{contact[key]}</span>
+                        </div>
+                    </div>
+                """ for key, css_icon, title in blocks if contact[key]))
+
+    footer = data['footer']
+    if footer:
+        if footer['name']:
+            page.text('footerTitle', footer['name'])
+        if footer['subtitle']:
+            page.text('footerSubtitle', footer['subtitle'])
+        if footer['copyright']:
+            page.html('footerCopy', footer['copyright'])
+        if _nonempty(footer['links']):
+            page.html('footerLinks', ''.join(f"""
+                        <li>
+                            <a href="{link['href']}" class="footer__link">{link['text']}</a>
+                        </li>
+                    """ for link in footer['links']))
+        if _nonempty(footer['socialLinks']):
+            page.html('footerSocials', ''.join(f"""
+                        <a href="{link['url']}" target="_blank" class="footer__social">
+                            <i class="uil {icon(link['platform'])}"></i>
+                        </a>
+                    """ for link in footer['socialLinks']))
+
+def _prerender_portfolio2(page, data):
+    icons = {'facebook': 'bxl-facebook', 'twitter': 'bxl-twitter', 'linkedin': 'bxl-linkedin', 'instagram': 'bxl-instagram',
+             'github': 'bxl-github', 'youtube': 'bxl-youtube', 'discord': 'bxl-discord', 'whatsapp': 'bxl-whatsapp'}
+    page.text('pageTitle', f"{data['name']} - Portfolio" if data['name'] else 'Responsive Personal Portfolio')
+
+    header = data['header']
+    if header and header['logo']:
+        page.html('logoText', f'{header["logo"]}.<span class="animate" style="--i:1;"></span>')
+
+    home = data['home']
+    if home:
+        if home['greeting']:
+            # #homeName is created by this write, so its text is part of the same markup.
+            name = html.escape(str(home['name']), quote=False) if home['name'] else 'John Doe'
+            page.html('homeTitle', f'{home["greeting"]} <span id="homeName">{name}</span><span class="animate" style="--i:2;"></span>')
+        elif home['name']:
+            page.text('homeName', home['name'])
+        if home['role']:
+            page.text('homeRole', home['role'])
+        if home['description']:
+            page.html('homeDescription', f'{home["description"]}<span class="animate" style="--i:4;"></span>')
+        if home['buttons']:
+            if home['buttons']['hire']:
+                page.text('hireMeBtn', home['buttons']['hire'])
+            if home['buttons']['talk']:
+                page.text('letsTalkBtn', home['buttons']['talk'])
+        if _nonempty(home['socialLinks']):
+            page.html('homeSocialLinks', ''.join(
+                f"<a href=\"{link['url']}\" target=\"_blank\"><i class='bx {icons.get(str(link['platform']).lower(), 'bxl-link')}'></i></a>"
+                for link in home['socialLinks']) + '<span class="animate" style="--i:6;"></span>')
+        if home['backgroundImage']:
+            page.set_attribute('home', 'style', f"background-image: url('{home['backgroundImage']}');")
+
+    about = data['about']
+    if about:
+        for key, element_id, index in (('heading', 'aboutHeading', 1), ('title', 'aboutTitle', 3), ('description', 'aboutDescription', 4)):
+            if about[key]:
+                page.html(element_id, f'{about[key]}<span class="animate scroll" style="--i:{index};"></span>')
+        if about['image']:
+            page.set_attribute('aboutImage', 'src', about['image'])
+        if about['buttonText']:
+            page.text('contactMeBtn', about['buttonText'])
+
+    journey = data['journey']
+    if not journey:
+        page.add_class('education', 'hidden')
+        page.add_class('educationNavLink', 'hidden')
+    else:
+        if journey['heading']:
+            page.html('journeyHeading', f'{journey["heading"]}<span class="animate scroll" style="--i:1;"></span>')
+
+        def column(title, entries, first_index):
+            contents = ''.join(f"""
+                        <div class="education-content">
+                            <div class="content">
+                                <div class="year"><i class='bx bxs-calendar'></i> {entry['year']}</div>
+                                <h3>{entry['title']}</h3>
+                                <p>{entry['description']}</p>
+                            </div>
+                        </div>
+                    """ for entry in entries)
+            return f"""
+                    <div class="education-column">
+                        <h3 class="title">{title}<span class="animate scroll" style="--i:{first_index};"></span></h3>
+                        <div class="education-box">
+                {contents}
+                            <span class="animate scroll" style="--i:{first_index + 1};"></span>
+                        </div>
+                    </div>
+                """
+
+        columns = ''
+        if _nonempty(journey['education']):
+            columns += column(journey['educationTitle'] or 'Education', journey['education'], 2)
+        if _nonempty(journey['experience']):
+            columns += column(journey['experienceTitle'] or 'Experience', journey['experience'], 5)
+        page.html('educationRow', columns)
+
+    skills = data['skills']
+    if _nonempty(skills):
+        page.html('skillsRow', ''.join(f"""
+                    <div class="skills-column">
+                        <h3 class="title">{category['title']}<span class="animate scroll" style="--i:{index * 3 + 2};"></span></h3>
+                        <div class="skills-box">
+                            <div class="skills-content">
+                {''.join(f'''
+                            <div class="progress">
+                                <h3>{skill['name']} <span>{skill['level']}%</span></h3>
+                                <div class="bar"><span style="width: {skill['level']}%;"></span></div>
+                            </div>
+                        ''' for skill in category['skills']) if category['skills'] else ''}
+                            </div>
+                            <span class="animate scroll" style="--i:{index * 3 + 3};"></span>
+                        </div>
+                    </div>
+                """ for index, category in enumerate(skills)))
+
+    footer = data['footer']
+    if footer and footer['text']:
+        page.text('footerText', footer['text'])
+
+def _prerender_portfolio3(page, data):
+    page.text('pageTitle', f"{data['name']} - Portfolio")
+    page.text('logoName', data['logoName'] or data['name'])
+    nav = data['nav'] or [{'label': 'Home', 'id': 'home'}, {'label': 'About', 'id': 'about'}, {'label': 'Skills', 'id': 'skills'},
+                          {'label': 'Projects', 'id': 'projects'}, {'label': 'Contact', 'id': 'contact'}]
+    page.html('navLinks', ''.join(f'<li><a href="#{item["id"]}" class="nav-link">{item["label"]}</a></li>' for item in map(js_value, nav)))
+
+    page.text('heroTitle', data['name'])
+    page.text('heroSubtitle', data['tagline'])
+    page.text('heroDescription', data['heroDescription'])
+    page.text('heroCta', data['heroCta']['text'] or "View My Work")
+    page.set_attribute('heroCta', 'href', data['heroCta']['link'] or "#projects")
+
+    about = data['about']
+    page.text('aboutSectionTitle', about['title'] or "About Me")
+    page.set_attribute('aboutImage', 'src', about['image'] or "")
+    page.set_attribute('aboutImage', 'alt', f"{data['name']} Profile Photo")
+    paragraphs = ''.join(f"<p>{paragraph}</p>" for paragraph in about['paragraphs']) if about['paragraphs'] else ''
+    page.html('aboutTextContainer', f"<h3>{about['greeting'] or ''}</h3>{paragraphs}")
+
+    page.text('skillsSectionTitle', data['skillsTitle'] or "My Skills")
+    if _nonempty(data['skills']):
+        page.html('skillsGrid', ''.join(f"""
+                    <div class="skill-card fade-in">
+                        <div class="skill-icon">{skill['icon']}</div>
+                        <h3 class="skill-title">{skill['title']}</h3>
+                        <p class="skill-description">{skill['description']}</p>
+                    </div>
+                """ for skill in data['skills']))
+    else:
+        page.add_class('skills', 'hidden')
+
+    page.text('projectsSectionTitle', data['projectsTitle'] or "Featured Projects")
+    if _nonempty(data['projects']):
+        def project(proj):
+            demo = f'<a href="{proj["demo"]}" class="project-link" target="_blank">Live Demo</a>' if proj['demo'] else ''
+            github = f'<a href="{proj["github"]}" class="project-link" target="_blank">GitHub</a>' if proj['github'] else ''
+            return f"""
+                    <div class="project-card fade-in">
+                        <div class="project-image">
+                            <img src="{proj['image']}" alt="{proj['title']}" class="project-img">
+                            <div class="project-overlay">
+                                <div class="project-links">
+                                    {demo}
+                                    {github}
+                                </div>
+                            </div>
+                        </div>
+                        <div class="project-info">
+                            <h3 class="project-title">{proj['title']}</h3>
+                            <p class="project-description">{proj['description']}</p>
+                        </div>
+                    </div>
+                """
+        page.html('projectsGrid', ''.join(project(proj) for proj in data['projects']))
+    else:
+        page.add_class('projects', 'hidden')
+
+    page.text('contactSectionTitle', data['contactTitle'] or "Get In Touch")
+    contact = data['contact']
+    details = ''.join(f"""
+                    <div class="contact-item">
+                        <span class="contact-icon">{item['icon']}</span>
+                        <span>{item['value']}</span>
+                    </div>
+                """ for item in contact['details'])
+    page.html('contactInfo', f"""
+                <h3>{contact['heading']}</h3>
+                <p>{contact['text']}</p>
+                {details}
+            """)
+
+    if _nonempty(data['social']):
+        page.html('footerSocialLinks', ''.join(f"""
+                    <a class="social-link" href="{social['url']}" target="_blank">{social['icon']}</a>
+                """ for social in data['social']))
+    page.html('footerCopyright', data['copyright'] or f"&copy; {datetime.now().year} {data['name']}. All rights reserved.")
+
+PRERENDERERS = {
+    ('resume', 1): _prerender_resume1,
+    ('resume', 2): _prerender_resume2,
+    ('resume', 3): _prerender_resume3,
+    ('resume', 4): _prerender_resume4,
+    ('resume', 5): _prerender_resume5,
+    ('portfolio', 1): _prerender_portfolio1,
+    ('portfolio', 2): _prerender_portfolio2,
+    ('portfolio', 3): _prerender_portfolio3,
+}
+
+class TemplateRegistry:
+    """Loads every templates/{resume,portfolio}N.html once, pre-split at the </body> insertion point."""
+    TEMPLATE_FILE = re.compile(r'^(resume|portfolio)(\d+)\.html$')
+
+    def __init__(self, templates_dir, auto_reload=False):
+        self.templates_dir = templates_dir
+        # When set, a template whose mtime changed on disk is recompiled on next use (dev mode).
+        self.auto_reload = auto_reload
+        self.templates = {}
+        # (compiled template, StaticPage) per template, built on first server-side render
+        self.pages = {}
+        self.lock = threading.Lock()
+        for filename in sorted(os.listdir(templates_dir)):
+            match = self.TEMPLATE_FILE.match(filename)
+            if match:
+                self.templates[(match.group(1), int(match.group(2)))] = self._compile(os.path.join(templates_dir, filename))
+
+    @staticmethod
+    def _compile(path):
+        mtime = os.path.getmtime(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        entry_point = 'renderResume' if os.path.basename(path).startswith('resume') else 'renderPortfolio'
+        fields = template_fields(html, entry_point)
+        if Config.TEMPLATE_MINIFY:
+            html = minify_html(html)
+        prefix, marker, suffix = html.rpartition('</body>')
+        if not marker:
+            return CompiledTemplate(html, '', mtime, fields)
+        return CompiledTemplate(prefix, marker + suffix, mtime, fields)
+
+    def ids(self, file_type):
+        return sorted(template_id for kind, template_id in self.templates if kind == file_type)
+
+    def get(self, file_type, template_id):
+        key = (file_type, int(template_id))
+        compiled = self.templates.get(key)
+        if compiled is not None and not self.auto_reload:
+            return compiled
+        path = os.path.join(self.templates_dir, f"{file_type}{template_id}.html")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Template {file_type}{template_id} not found")
+        if compiled is None or os.path.getmtime(path) != compiled.mtime:
+            with self.lock:
+                compiled = self.templates[key] = self._compile(path)
+        return compiled
+
+    def page(self, file_type, template_id):
+        """The template as a StaticPage for server-side rendering, rebuilt whenever the template is recompiled.
+
+        Resume scripts only render the data, so they are dropped. Portfolios keep theirs for navigation
+        and animations, with an onload that initialises them instead of rendering the sample data.
+        """
+        compiled = self.get(file_type, template_id)
+        key = (file_type, int(template_id))
+        cached = self.pages.get(key)
+        if cached is not None and cached[0] is compiled:
+            return cached[1]
+        if file_type == 'resume':
+            markup = re.sub(r'<script\b[^>]*>.*?</script\s*>', '', compiled.prefix + compiled.suffix, flags=re.DOTALL | re.IGNORECASE)
+        else:
+            markup = ''.join((
+                compiled.prefix,
+                "<script>window.onload = () => { if(typeof initializePortfolio === 'function') initializePortfolio(); };</script>",
+                compiled.suffix,
+            ))
+        page = StaticPage(markup)
+        self.pages[key] = (compiled, page)
+        return page
+
+class TemplateService:
+    def __init__(self, artifact_store):
         # Templates are in the root 'templates' folder
         self.templates_dir = os.path.join(os.path.dirname(__file__), '..', 'templates')
-        # Use /tmp for temporary file storage
-        self.storage_dir = Config.GENERATED_FOLDER
-    
-    def _generate_file(self, user_data, template_id, file_type):
+        self.registry = TemplateRegistry(self.templates_dir, auto_reload=Config.TEMPLATE_AUTO_RELOAD)
+        self.artifact_store = artifact_store
+
+    def render(self, user_data, template_id, file_type, mode=None):
+        """Render a document. In 'server' mode (default Config.RENDER_MODE) the final markup is written
+        here when the template has a server renderer; otherwise the template script renders the embedded data."""
+        prerender = PRERENDERERS.get((file_type, int(template_id))) if (mode or Config.RENDER_MODE) == 'server' else None
+        with metrics.span('template_render', template=f"{file_type}{template_id}", mode='server' if prerender else 'client'):
+            if prerender is not None:
+                try:
+                    patch = PagePatch()
+                    prerender(patch, js_value(self._template_data(user_data, template_id, file_type)))
+                    return self.registry.page(file_type, template_id).render(patch)
+                except Exception as e:
+                    logger.warning(f"⚠️ Server render of {file_type}{template_id} failed, rendering client-side: {e}")
+            return self._render(user_data, template_id, file_type)
+
+    @staticmethod
+    def _template_data(user_data, template_id, file_type):
+        if file_type == 'resume':
+            return user_data
+        return user_data.get('portfolio_data', {}).get(f"template{template_id}", user_data)
+
+    def _render(self, user_data, template_id, file_type):
+        compiled = self.registry.get(file_type, template_id)
+        data_to_inject = self._template_data(user_data, template_id, file_type)
+        render_func = 'renderResume' if file_type == 'resume' else 'renderPortfolio'
+        if compiled.fields is not None:
+            # Embed only what the template reads (resumes never need portfolio_data).
+            data_to_inject = {key: value for key, value in data_to_inject.items() if key in compiled.fields}
+        # Compact, and with "</" escaped so no value can close the <script> element.
+        payload = json.dumps(data_to_inject, separators=(',', ':'), ensure_ascii=False).replace('</', '<\\/')
+        return ''.join((
+            compiled.prefix,
+            f"<script>window.onload = () => {{ if(typeof {render_func} === 'function') {render_func}(",
+            payload,
+            "); };</script>",
+            compiled.suffix,
+        ))
+
+    def _generate_file(self, user_data, template_id, file_type, mode=None):
         try:
-            template_path = os.path.join(self.templates_dir, f"{file_type}{template_id}.html")
-            with open(template_path, 'r', encoding='utf-8') as f:
-                template_html = f.read()
-            
-            if file_type == 'resume':
-                data_to_inject = user_data
-                render_func = 'renderResume'
-            else:
-                portfolio_data = user_data.get('portfolio_data', {})
-                template_key = f"template{template_id}"
-                data_to_inject = portfolio_data.get(template_key, user_data)
-                render_func = 'renderPortfolio'
-            
-            script_injection = f"<script>window.onload = () => {{ if(typeof {render_func} === 'function') {render_func}({json.dumps(data_to_inject)}); }};</script>"
-            populated_html = template_html.replace('</body>', f'{script_injection}</body>')
-            
-            filename = f"{file_type}_{uuid.uuid4().hex[:8]}.html"
-            output_path = os.path.join(self.storage_dir, filename)
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(populated_html)
-            
+            populated_html = self.render(user_data, template_id, file_type, mode).encode('utf-8')
+            # Content-addressed names make the URLs immutable and dedupe identical documents.
+            filename = f"{file_type}_{hashlib.sha256(populated_html).hexdigest()[:20]}.html"
+            self.artifact_store.put(filename, populated_html)
             return filename
         except Exception as e:
             raise Exception(f"Failed to generate {file_type}: {e}")
 
-    def generate_resume(self, user_data, template_id):
-        return self._generate_file(user_data, template_id, 'resume')
+    def generate_resume(self, user_data, template_id, mode=None):
+        return self._generate_file(user_data, template_id, 'resume', mode)
 
-    def generate_portfolio(self, user_data, template_id):
-        return self._generate_file(user_data, template_id, 'portfolio')
+    def generate_portfolio(self, user_data, template_id, mode=None):
+        return self._generate_file(user_data, template_id, 'portfolio', mode)
 
 # --- Initialization ---
-# Create /tmp directories on function startup
-os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(Config.GENERATED_FOLDER, exist_ok=True)
 
-# Initialize services
-pdf_parser = PDFParser()
-github_service = GitHubService(token=Config.GITHUB_TOKEN)
-gemini_service = GeminiService(api_keys=Config.GEMINI_API_KEYS)
-template_service = TemplateService()
+class LazyService:
+    """Builds a service on first use, exactly once, even when several threads ask for it at the same time."""
+    def __init__(self, factory):
+        self.factory = factory
+        self.instance = None
+        self.built = False
+        self.lock = threading.Lock()
+
+    def get(self):
+        if not self.built:
+            with self.lock:
+                if not self.built:
+                    self.instance = self.factory()
+                    self.built = True
+        return self.instance
+
+    def peek(self):
+        """The service if it has been built already, else None."""
+        return self.instance
+
+    def set(self, instance):
+        with self.lock:
+            self.instance = instance
+            self.built = True
+
+# Services (and the SDKs behind them) are created on first use, so cold starts that only
+# serve /api/health, metrics or previews never pay for them.
+llm_cache = LazyService(create_llm_cache)
+github_cache = LazyService(create_github_cache)
+pdf_parser = LazyService(lambda: PDFParser(cache=MemoryCacheBackend(Config.PDF_CACHE_ENTRIES) if Config.PDF_CACHE_ENTRIES else None))
+github_service = LazyService(lambda: GitHubService(token=Config.GITHUB_TOKEN, cache=github_cache.get()))
+gemini_service = LazyService(lambda: GeminiService(api_keys=Config.GEMINI_API_KEYS, cache=llm_cache.get()))
+artifact_store = LazyService(create_artifact_store)
+template_service = LazyService(lambda: TemplateService(artifact_store.get()))
+generation_store = LazyService(create_generation_store)
+
+# --- Generation Pipeline ---
+
+def run_generation(pdf_file, github_url, portfolio_template, resume_template, emit=None, deadline_seconds=None):
+    """Run PDF → GitHub → Gemini → templates, reporting each finished stage to `emit(stage, data)`."""
+    emit = emit or (lambda stage, data: None)
+    logger.info("🚀🚀🚀 STARTING NEW GENERATION 🚀🚀🚀")
+    deadline = Deadline(deadline_seconds or Config.GENERATION_DEADLINE)
+    status = 'failed'
+    try:
+        with metrics.span('generation'):
+            with metrics.span('pdf_extract'):
+                linkedin_text = pdf_parser.get().extract_text_from_pdf(pdf_file)
+            emit('pdf_parsed', {'characters': len(linkedin_text)})
+            with metrics.span('github_fetch'):
+                github_data = github_service.get().get_user_data(github_url, deadline)
+            profile = github_data.get('profile', {})
+            emit('github_fetched', {
+                'name': profile.get('name') or profile.get('login'),
+                'repositories': [repo.get('name') for repo in github_data.get('repositories', [])]
+            })
+
+            with metrics.span('ai_generation'):
+                user_data = gemini_service.get().extract_user_data(linkedin_text, github_data, pdf_parser.get(), on_progress=emit, deadline=deadline)
+
+            logger.info("📝 [5/5] Starting File Generation...")
+            resume_filename = template_service.get().generate_resume(user_data, resume_template)
+            portfolio_filename = template_service.get().generate_portfolio(user_data, portfolio_template)
+            logger.info("📝 [5/5] ✅ File Generation Successful.")
+            generation_id = save_generation(linkedin_text, github_url, github_data, user_data)
+        status = 'succeeded'
+    finally:
+        metrics.inc('portfoliogen_generations_total', status=status)
+    result = {
+        'success': True,
+        'generation_id': generation_id,
+        'resume_url': f'/api/download/resume/{resume_filename}',
+        'portfolio_url': f'/api/download/portfolio/{portfolio_filename}',
+        'preview_resume_url': f'/api/preview/resume/{resume_filename}',
+        'preview_portfolio_url': f'/api/preview/portfolio/{portfolio_filename}',
+        'degraded': list(deadline.degraded)
+    }
+    emit('files_rendered', result)
+
+    logger.info("🎉🎉🎉 GENERATION COMPLETE 🎉🎉🎉")
+    return result
+
+def save_generation(linkedin_text, github_url, github_data, user_data, generation_id=None):
+    """Keep a generation for /api/render. Returns its id, or None when the store is disabled."""
+    store = generation_store.get()
+    if store is None:
+        return None
+    record = {'linkedin_text': linkedin_text, 'github_url': github_url, 'github_data': github_data, 'user_data': user_data}
+    return store.save(record, generation_id)
+
+class GenerationNotFound(Exception):
+    pass
+
+class UnknownTemplateError(ValueError):
+    pass
+
+def select_templates(file_type, value):
+    """Template ids named by `value`: an id, a list of ids or "all".
+
+    Raises ValueError for ids that are not integers and UnknownTemplateError for ids with no template.
+    """
+    available = template_service.get().registry.ids(file_type)
+    if value == 'all':
+        return available
+    try:
+        template_ids = [int(v) for v in (value if isinstance(value, list) else [value])]
+    except (TypeError, ValueError):
+        raise ValueError('Template ids must be integers or "all"')
+    unknown = [template_id for template_id in template_ids if template_id not in available]
+    if unknown:
+        raise UnknownTemplateError(f"Unknown {file_type} template(s): {unknown}")
+    return template_ids
+
+def render_generation(generation_id, resume_templates=(), portfolio_templates=(), refresh=None, mode=None):
+    """Re-render a stored generation with other templates, optionally refreshing its GitHub data or AI text first."""
+    store = generation_store.get()
+    record = store.load(generation_id) if store is not None else None
+    if record is None:
+        raise GenerationNotFound(f"Generation {generation_id} not found or expired")
+    deadline = Deadline(Config.GENERATION_DEADLINE)
+    with metrics.span('render', refresh=refresh or 'none'):
+        if refresh == 'github':
+            # New repositories and descriptions, but the summary only depends on the PDF.
+            record['github_data'] = github_service.get().get_user_data(record['github_url'], deadline)
+            record['user_data'] = gemini_service.get().extract_user_data(record['linkedin_text'], record['github_data'], pdf_parser.get(),
+                                                                         deadline=deadline, summary=record['user_data']['summary'])
+        elif refresh == 'ai':
+            record['user_data'] = gemini_service.get().extract_user_data(record['linkedin_text'], record['github_data'], pdf_parser.get(),
+                                                                         deadline=deadline, refresh=True)
+        if refresh:
+            store.save(record, generation_id)
+        documents = []
+        for file_type, template_ids in (('resume', resume_templates), ('portfolio', portfolio_templates)):
+            for template_id in template_ids:
+                filename = template_service.get()._generate_file(record['user_data'], template_id, file_type, mode)
+                documents.append({
+                    'type': file_type, 'template': template_id,
+                    'url': f'/api/download/{file_type}/{filename}', 'preview_url': f'/api/preview/{file_type}/{filename}'
+                })
+    return {'success': True, 'generation_id': generation_id, 'documents': documents, 'degraded': list(deadline.degraded)}
+
+def check_manifest_templates(manifest):
+    """Reject template ids that no entry could render before any profile spends GitHub or Gemini quota."""
+    for index, entry in enumerate(manifest):
+        for file_type in ('resume', 'portfolio'):
+            try:
+                template_id = int(entry.get(f'{file_type}_template', 1))
+            except (TypeError, ValueError):
+                raise ValueError(f"Manifest entry {index}: {file_type}_template must be a single template id")
+            try:
+                select_templates(file_type, template_id)
+            except UnknownTemplateError as e:
+                raise ValueError(f"Manifest entry {index}: {e}")
+
+def run_batch(profiles, archive_file, emit=None, max_workers=None):
+    """Generate every profile of a manifest on a bounded pool and zip the documents into `archive_file`.
+
+    Each profile is a dict with pdf (a file object), github_url and optional portfolio_template and
+    resume_template. All of them go through the shared services, so they share the HTTP connection
+    pools, caches and Gemini key budget. `emit('profile', entry)` reports each one as it finishes.
+    """
+    emit = emit or (lambda stage, data: None)
+    entries = [None] * len(profiles)
+    archive_lock = threading.Lock()
+    with zipfile.ZipFile(archive_file, 'w', zipfile.ZIP_DEFLATED) as archive:
+        def run_one(index, profile):
+            entry = {'index': index, 'github_url': profile['github_url']}
+            try:
+                result = run_generation(profile['pdf'], profile['github_url'], int(profile.get('portfolio_template', 1)),
+                                        int(profile.get('resume_template', 1)), deadline_seconds=Config.BATCH_PROFILE_DEADLINE)
+                entry.update(status='succeeded', result=result)
+                # Archive straight away, before the artifacts can be evicted from the store.
+                username = re.sub(r'[^\w.-]', '_', profile['github_url'].rstrip('/').rsplit('/', 1)[-1])
+                folder = f"{index + 1:03d}_{username}"
+                documents = {f"{folder}/{file_type}.html": read_artifact(artifact_store.get().get(result[f'{file_type}_url'].rsplit('/', 1)[-1]))
+                             for file_type in ('resume', 'portfolio')}
+                with archive_lock:
+                    for path, data in documents.items():
+                        archive.writestr(path, data)
+            except Exception as e:
+                logger.error(f"🔥🔥🔥 BATCH PROFILE {index} FAILED: {e} 🔥🔥🔥")
+                entry.update(status='failed', error=str(e))
+            entries[index] = entry
+            emit('profile', entry)
+
+        with metrics.span('batch'):
+            with ThreadPoolExecutor(max_workers=max_workers or Config.BATCH_MAX_WORKERS, thread_name_prefix="batch") as executor:
+                list(executor.map(lambda args: run_one(*args), enumerate(profiles)))
+        archive.writestr('results.json', json.dumps(entries, indent=2))
+    metrics.inc('portfoliogen_batch_profiles_total', len(profiles))
+    return {
+        'success': True,
+        'total': len(entries),
+        'succeeded': sum(entry['status'] == 'succeeded' for entry in entries),
+        'failed': sum(entry['status'] == 'failed' for entry in entries),
+        'profiles': entries
+    }
+
+# --- Job Queue ---
+
+class QueueFullError(Exception):
+    pass
+
+class GenerationJobQueue:
+    """In-process job runner with bounded workers, a pending-job limit and deduplication of in-flight jobs."""
+    def __init__(self, run, max_workers, max_pending, ttl):
+        self.run = run
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.jobs = {}
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+
+    def submit(self, dedupe_key, *args):
+        """Queue `run(*args)` and return (job, created). An identical in-flight job is returned instead of queuing a new one."""
+        with self.lock:
+            self._expire()
+            job_id = self.in_flight.get(dedupe_key)
+            if job_id is not None:
+                return self.jobs[job_id], False
+            if len(self.in_flight) >= self.max_pending:
+                raise QueueFullError("Too many generations in progress, please retry shortly.")
+            job = {'id': uuid.uuid4().hex, 'status': 'queued', 'created_at': time.time(), 'finished_at': None, 'result': None, 'error': None}
+            self.jobs[job['id']] = job
+            self.in_flight[dedupe_key] = job['id']
+        self.executor.submit(self._execute, job, dedupe_key, args)
+        return job, True
+
+    def _execute(self, job, dedupe_key, args):
+        job['status'] = 'running'
+        try:
+            job['result'] = self.run(*args)
+            job['status'] = 'succeeded'
+        except Exception as e:
+            logger.error(f"🔥🔥🔥 JOB {job['id']} FAILED: {e} 🔥🔥🔥")
+            job['error'] = str(e)
+            job['status'] = 'failed'
+        finally:
+            job['finished_at'] = time.time()
+            with self.lock:
+                self.in_flight.pop(dedupe_key, None)
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [job_id for job_id, job in self.jobs.items() if job['finished_at'] and job['finished_at'] < cutoff]:
+            del self.jobs[job_id]
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def stats(self):
+        with self.lock:
+            return {'in_flight': len(self.in_flight), 'tracked': len(self.jobs), 'max_pending': self.max_pending}
+
+job_queue = LazyService(lambda: GenerationJobQueue(run_generation, Config.JOB_MAX_WORKERS, Config.JOB_MAX_PENDING, Config.JOB_TTL))
+
+if Config.EAGER_INIT:
+    for service in (pdf_parser, github_service, gemini_service, template_service, job_queue):
+        service.get()
 
 # --- Routes ---
 
@@ -403,55 +2875,190 @@ def home():
         'timestamp': datetime.now().isoformat()
     })
 
+@app.before_request
+def read_upload_limits():
+    # Parse multipart bodies up front so an oversized one fails here, as a 413, and not inside a route's own error handling.
+    if request.mimetype == 'multipart/form-data':
+        request.files
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    return jsonify({'error': f"Request body is larger than the {request.max_content_length} byte limit"}), 413
+
+def parse_generation_request():
+    """Read the /api/generate form. Returns (pdf_file, github_url, portfolio_template, resume_template) or None."""
+    if 'linkedin_pdf' not in request.files or not request.form.get('github_url'):
+        return None
+    return (
+        request.files['linkedin_pdf'],
+        request.form.get('github_url'),
+        int(request.form.get('portfolio_template', 1)),
+        int(request.form.get('resume_template', 1)),
+    )
+
 @app.route('/api/generate', methods=['POST'])
 def generate_portfolio_resume():
     try:
-        if 'linkedin_pdf' not in request.files or not request.form.get('github_url'):
+        generation_request = parse_generation_request()
+        if generation_request is None:
             return jsonify({'error': 'Missing required fields'}), 400
-        
-        pdf_file = request.files['linkedin_pdf']
-        github_url = request.form.get('github_url')
-        portfolio_template = int(request.form.get('portfolio_template', 1))
-        resume_template = int(request.form.get('resume_template', 1))
+        return jsonify(run_generation(*generation_request))
+    except PDFTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
+    except Exception as e:
+        logger.error(f"🔥🔥🔥 GENERATION FAILED: {e} 🔥🔥🔥")
+        return jsonify({'error': str(e)}), 500
 
-        print("\n🚀🚀🚀 STARTING NEW GENERATION 🚀🚀🚀")
-        
-        linkedin_text = pdf_parser.extract_text_from_pdf(pdf_file)
-        github_data = github_service.get_user_data(github_url)
-        
-        user_data = gemini_service.extract_user_data(linkedin_text, github_data, pdf_parser)
-        
-        print("📝 [5/5] Starting File Generation...")
-        resume_filename = template_service.generate_resume(user_data, resume_template)
-        portfolio_filename = template_service.generate_portfolio(user_data, portfolio_template)
-        print("📝 [5/5] ✅ File Generation Successful.")
-
-        print("\n🎉🎉🎉 GENERATION COMPLETE 🎉🎉🎉\n")
-        return jsonify({
-            'success': True,
-            'resume_url': f'/api/download/resume/{resume_filename}',
-            'portfolio_url': f'/api/download/portfolio/{portfolio_filename}',
-            'preview_resume_url': f'/api/preview/resume/{resume_filename}',
-            'preview_portfolio_url': f'/api/preview/portfolio/{portfolio_filename}'
-        })
+@app.route('/api/generate/stream', methods=['POST'])
+def generate_portfolio_resume_stream():
+    """Same as /api/generate, but streams every pipeline stage as Server-Sent Events (or NDJSON with ?format=ndjson)"""
+    try:
+        generation_request = parse_generation_request()
+        if generation_request is None:
+            return jsonify({'error': 'Missing required fields'}), 400
     except Exception as e:
-        print(f"\n🔥🔥🔥 GENERATION FAILED: {e} 🔥🔥🔥\n")
+        return jsonify({'error': str(e)}), 500
+    pdf_file, github_url, portfolio_template, resume_template = generation_request
+    # The pipeline outlives this request context, so take the upload with it.
+    pdf_file = BytesIO(pdf_file.read())
+    return event_stream(lambda emit: run_generation(pdf_file, github_url, portfolio_template, resume_template, emit=emit))
+
+def event_stream(run):
+    """Run `run(emit)` in the background and stream what it emits, then 'complete' (or 'error'), as SSE or NDJSON."""
+    ndjson = request.args.get('format') == 'ndjson'
+    events = queue.Queue()
+
+    def worker():
+        try:
+            result = run(lambda stage, data: events.put((stage, data)))
+            events.put(('complete', result))
+        except Exception as e:
+            logger.error(f"🔥🔥🔥 GENERATION FAILED: {e} 🔥🔥🔥")
+            events.put(('error', {'error': str(e)}))
+        events.put(None)
+
+    def stream():
+        while (event := events.get()) is not None:
+            stage, data = event
+            if ndjson:
+                yield json.dumps({'stage': stage, 'data': data}) + "\n"
+            else:
+                yield f"event: {stage}\ndata: {json.dumps(data)}\n\n"
+
+    threading.Thread(target=worker, daemon=True).start()
+    return Response(stream(), mimetype='application/x-ndjson' if ndjson else 'text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/batch', methods=['POST'])
+def generate_batch():
+    """Generate many profiles at once, streaming each result and finishing with a zip of every document.
+
+    Form: `manifest`, a JSON list of {"pdf": <name of an uploaded file field>, "github_url", "portfolio_template",
+    "resume_template"}, plus the PDFs. Large cohorts should use `python api/index.py batch` instead, since
+    serverless request bodies are size-limited.
+    """
+    try:
+        manifest = json.loads(request.form.get('manifest', ''))
+    except ValueError:
+        return jsonify({'error': 'manifest is not valid JSON'}), 400
+    if not isinstance(manifest, list) or not manifest:
+        return jsonify({'error': 'manifest must be a non-empty JSON list'}), 400
+    if len(manifest) > Config.BATCH_MAX_PROFILES:
+        return jsonify({'error': f'At most {Config.BATCH_MAX_PROFILES} profiles per batch'}), 400
+    if not all(isinstance(entry, dict) and entry.get('pdf') in request.files and entry.get('github_url') for entry in manifest):
+        return jsonify({'error': 'Every manifest entry needs github_url and an uploaded pdf field'}), 400
+    try:
+        check_manifest_templates(manifest)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    profiles, uploads = [], {}
+    for entry in manifest:
+        # Several entries may share one upload (e.g. the same PDF with other templates).
+        if entry['pdf'] not in uploads:
+            uploads[entry['pdf']] = request.files[entry['pdf']].read()
+        profiles.append(dict(entry, pdf=BytesIO(uploads[entry['pdf']])))
+
+    def run(emit):
+        archive = BytesIO()
+        summary = run_batch(profiles, archive, emit=emit)
+        data = archive.getvalue()
+        archive_name = f"batch_{hashlib.sha256(data).hexdigest()[:20]}.zip"
+        artifact_store.get().put(archive_name, data)
+        summary['zip_url'] = f'/api/download/batch/{archive_name}'
+        return summary
+
+    return event_stream(run)
+
+@app.route('/api/jobs', methods=['POST'])
+def create_generation_job():
+    """Queue a generation (same form as /api/generate) and return its job id immediately"""
+    try:
+        generation_request = parse_generation_request()
+        if generation_request is None:
+            return jsonify({'error': 'Missing required fields'}), 400
+        pdf_file, github_url, portfolio_template, resume_template = generation_request
+        pdf_bytes = pdf_file.read()
+        username = github_service.get().extract_username_from_url(github_url).lower()
+        dedupe_key = (hashlib.sha256(pdf_bytes).hexdigest(), username, portfolio_template, resume_template)
+        job, created = job_queue.get().submit(dedupe_key, BytesIO(pdf_bytes), github_url, portfolio_template, resume_template)
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '5'}
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    return jsonify({'job_id': job['id'], 'status': job['status'], 'status_url': f"/api/jobs/{job['id']}", 'deduplicated': not created}), 202
+
+@app.route('/api/jobs/<job_id>')
+def get_generation_job(job_id):
+    """Report a job's status, and its result once it has finished"""
+    job = job_queue.get().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({key: job[key] for key in ('id', 'status', 'result', 'error', 'created_at', 'finished_at')})
+
+@app.route('/api/render', methods=['POST'])
+def render_stored_generation():
+    """Re-render a previous generation with other templates, without re-uploading the PDF.
+
+    JSON body: generation_id, resume_template and/or portfolio_template (an id, a list of ids or "all"),
+    and optionally refresh: "github" or "ai" to rebuild that part of the data first, and mode: "client"
+    or "server" to override RENDER_MODE.
+    """
+    body = request.get_json(silent=True) or {}
+    refresh, mode = body.get('refresh'), body.get('mode')
+    if not body.get('generation_id') or refresh not in (None, 'github', 'ai'):
+        return jsonify({'error': 'Missing generation_id or invalid refresh (use "github" or "ai")'}), 400
+    if mode not in (None, 'client', 'server'):
+        return jsonify({'error': 'Invalid mode (use "client" or "server")'}), 400
+    try:
+        selected = {file_type: select_templates(file_type, body.get(f'{file_type}_template', [])) for file_type in ('resume', 'portfolio')}
+    except UnknownTemplateError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not selected['resume'] and not selected['portfolio']:
+        return jsonify({'error': 'Nothing to render: pass resume_template and/or portfolio_template'}), 400
+    try:
+        return jsonify(render_generation(body['generation_id'], selected['resume'], selected['portfolio'], refresh, mode))
+    except GenerationNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        logger.error(f"🔥🔥🔥 RENDER FAILED: {e} 🔥🔥🔥")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/download/<file_type>/<filename>')
 def download_file(file_type, filename):
-    """Download generated file from /tmp"""
-    file_path = os.path.join(Config.GENERATED_FOLDER, filename)
-    if os.path.exists(file_path):
-        return send_file(file_path, as_attachment=True, download_name=filename)
+    """Download a generated file from the artifact store"""
+    artifact = artifact_store.get().get(filename)
+    if artifact is not None:
+        return artifact_response(artifact, as_attachment=True)
     return jsonify({'error': 'File not found'}), 404
 
 @app.route('/api/preview/<file_type>/<filename>')
 def preview_file(file_type, filename):
-    """Preview generated file from /tmp"""
-    file_path = os.path.join(Config.GENERATED_FOLDER, filename)
-    if os.path.exists(file_path):
-        return send_file(file_path)
+    """Preview a generated file from the artifact store"""
+    artifact = artifact_store.get().get(filename)
+    if artifact is not None:
+        return artifact_response(artifact)
     return jsonify({'error': 'File not found'}), 404
 
 @app.route('/api/templates/portfolio/<int:template_id>')
@@ -477,25 +3084,70 @@ def get_resume_template(template_id):
         return jsonify({'error': str(e)}), 500
 # ... (all your existing code above)
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Stage timings and counters in the Prometheus text exposition format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'environment': 'serverless'
+        'environment': 'serverless',
+        'llm_cache': llm_cache.peek().stats() if llm_cache.peek() else None,
+        'github_cache': github_cache.peek().stats() if github_cache.peek() else None,
+        'jobs': job_queue.peek().stats() if job_queue.peek() else None,
+        'generations': generation_store.peek().stats() if generation_store.peek() else None,
+        'gemini_keys': gemini_service.peek().key_pool.stats() if gemini_service.peek() else None
     })
 
+def batch_cli(argv):
+    """`python api/index.py batch manifest.json --out outputs.zip`. Manifest PDF paths are relative to the manifest."""
+    import argparse
+    parser = argparse.ArgumentParser(prog='index.py batch', description="Generate documents for every profile in a manifest.")
+    parser.add_argument('manifest', help='JSON list of {"pdf", "github_url", "portfolio_template", "resume_template"}')
+    parser.add_argument('--out', default='portfolios.zip', help="zip archive to write")
+    parser.add_argument('--workers', type=int, default=Config.BATCH_MAX_WORKERS)
+    args = parser.parse_args(argv)
+    with open(args.manifest, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    try:
+        check_manifest_templates(manifest)
+    except ValueError as e:
+        parser.error(str(e))
+    base_dir = os.path.dirname(os.path.abspath(args.manifest))
+    profiles = []
+    for entry in manifest:
+        with open(os.path.join(base_dir, entry['pdf']), 'rb') as f:
+            profiles.append(dict(entry, pdf=BytesIO(f.read())))
+    # One JSON line per finished profile, so the output can be piped or tailed.
+    emit = lambda stage, data: print(json.dumps({'stage': stage, 'data': data}), flush=True)
+    with open(args.out, 'wb') as archive:
+        summary = run_batch(profiles, archive, emit=emit, max_workers=args.workers)
+    print(f"📦 {summary['succeeded']}/{summary['total']} profile(s) generated, written to {args.out}", file=sys.stderr)
+    return 0 if not summary['failed'] else 1
+
 # ===== ADD THIS SECTION =====
 # For local development only
 if __name__ == '__main__':
+    if sys.argv[1:2] == ['batch']:
+        sys.exit(batch_cli(sys.argv[2:]))
     print("🚀 Starting Portfolio Generator Backend (Development Mode)...")
     print("📍 Backend running at: http://localhost:5000")
     print("📍 Frontend should be at: http://localhost:5173")
     print("\n📝 Available endpoints:")
     print("   - Health Check: http://localhost:5000/api/health")
+    print("   - Metrics: http://localhost:5000/api/metrics")
     print("   - Generate: http://localhost:5000/api/generate")
+    print("   - Generate (streaming): http://localhost:5000/api/generate/stream")
+    print("   - Generate (job): http://localhost:5000/api/jobs")
+    print("   - Re-render: http://localhost:5000/api/render")
+    print("   - Batch: http://localhost:5000/api/batch (or: python api/index.py batch manifest.json)")
     print("   - Template Preview: http://localhost:5000/api/templates/portfolio/{id}")
     print("   - Template Preview: http://localhost:5000/api/templates/resume/{id}")
     print("\n⚡ Press CTRL+C to stop\n")
+
+    template_service.get().registry.auto_reload = True
     
     app.run(debug=True, port=5000, host='0.0.0.0')
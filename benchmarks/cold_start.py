@@ -0,0 +1,68 @@
+"""Cold-start benchmark: module import time and first-request latency per route, each in a fresh process.
+
+Every sample starts a new interpreter, imports api/index.py and times the first and second
+request to one route. /api/generate runs against the fake GitHub server and fake Gemini
+models, but still builds the real Gemini client objects so their import cost is counted.
+
+Usage: python benchmarks/cold_start.py [--runs 5] [--eager]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = r'''
+import io, json, sys, time
+sys.path.insert(0, {benchmarks!r})
+start = time.perf_counter()
+from fakes import FakeGeminiModel, FakeGitHubServer, linkedin_profile, load_api, make_pdf, paginate
+api = load_api()
+import_time = time.perf_counter() - start
+route = {route!r}
+client = api.app.test_client()
+if route == '/api/generate':
+    github = FakeGitHubServer(latency=0.0)
+    build_real_model = api.GeminiService._build_model
+    api.GeminiService._build_model = staticmethod(lambda key: (build_real_model(key), FakeGeminiModel(key, latency=0.0))[1])
+    pdf = make_pdf(paginate(linkedin_profile()[0]))
+    def call():
+        service = api.github_service.get()
+        service.base_url = github.url
+        return client.post(route, data={{'linkedin_pdf': (io.BytesIO(pdf), 'p.pdf'), 'github_url': 'https://github.com/cold'}})
+else:
+    call = lambda: client.get(route)
+timings = []
+for _ in range(2):
+    start = time.perf_counter()
+    status = call().status_code
+    timings.append(time.perf_counter() - start)
+print(json.dumps({{'import': import_time, 'first': timings[0], 'second': timings[1], 'status': status}}))
+'''
+
+ROUTES = ['/api/health', '/api/metrics', '/api/templates/resume/1', '/api/templates/portfolio/1', '/api/generate']
+
+
+def sample(route, eager):
+    env = dict(os.environ, GEMINI_API_KEYS='bench-key', LOG_LEVEL='WARNING', GITHUB_CACHE_BACKEND='none', EAGER_INIT='true' if eager else 'false')
+    code = CHILD.format(benchmarks=os.path.dirname(os.path.abspath(__file__)), route=route)
+    output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--eager', action='store_true', help="build every service at import (EAGER_INIT=true) for comparison")
+    args = parser.parse_args()
+
+    print(f"{'route':<28} {'import':>9} {'first req':>10} {'second req':>11} {'status':>7}   (median of {args.runs}, {'eager' if args.eager else 'lazy'} init)")
+    for route in ROUTES:
+        samples = [sample(route, args.eager) for _ in range(args.runs)]
+        median = lambda key: statistics.median(s[key] for s in samples) * 1000
+        print(f"{route:<28} {median('import'):>7.1f}ms {median('first'):>8.1f}ms {median('second'):>9.1f}ms {samples[-1]['status']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""End-to-end benchmark of /api/generate against offline stand-ins for GitHub and Gemini.
+
+Drives the Flask app through its test client with synthetic LinkedIn PDFs, a local fake
+GitHub server and fake Gemini models, and reports p50/p95 latency and throughput at several
+concurrency levels plus the time at which each pipeline stage finishes.
+
+Usage: python benchmarks/e2e.py [--requests 20] [--concurrency 1 4 8] [--gemini-latency 0.3]
+       [--github-latency 0.05] [--error-rate 0.05] [--keys 3] [--warm-caches] [--batch]
+"""
+import argparse
+import contextlib
+import io
+import json
+import re
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fakes import FakeGitHubServer, FakeModelFactory, linkedin_profile, load_api, make_pdf, paginate
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def form(pdf, username, template_id=1):
+    return {'linkedin_pdf': (io.BytesIO(pdf), 'profile.pdf'), 'github_url': f'https://github.com/{username}',
+            'portfolio_template': str(template_id), 'resume_template': str(template_id)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--gemini-latency', type=float, default=0.3)
+    parser.add_argument('--github-latency', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of Gemini calls failing with 429")
+    parser.add_argument('--keys', type=int, default=3)
+    parser.add_argument('--rpm', type=float, default=10000, help="per-key rate budget given to GeminiService")
+    parser.add_argument('--warm-caches', action='store_true', help="keep the LLM/GitHub/PDF caches enabled")
+    parser.add_argument('--batch', action='store_true', help="describe projects with one batched prompt")
+    parser.add_argument('--verbose', action='store_true', help="show the API's own log output")
+    args = parser.parse_args()
+
+    api = load_api()
+    github = FakeGitHubServer(latency=args.github_latency)
+    api.Config.GEMINI_RPM = args.rpm
+    api.Config.GEMINI_BURST = int(args.rpm)
+    api.Config.GEMINI_BATCH_PROJECTS = args.batch
+    api.Config.GEMINI_COOLDOWN = 1
+    # Batched prompts get a JSON reply naming every project listed in the prompt.
+    reply = lambda prompt: json.dumps({name: "A generated description." for name in re.findall(r'\*\*Name\*\*: "(.*?)"', prompt)}) \
+        if 'JSON object' in prompt else "A generated description."
+    factory = FakeModelFactory(latency=args.gemini_latency, error_rate=args.error_rate, reply=reply)
+    api.gemini_service.set(api.GeminiService([f"key-{i}" for i in range(args.keys)], model_factory=factory,
+                                             cache=api.llm_cache.get() if args.warm_caches else None))
+    api.github_service.set(api.GitHubService(cache=api.github_cache.get() if args.warm_caches else None))
+    api.github_service.get().base_url = github.url
+    if not args.warm_caches:
+        api.pdf_parser.get().cache = None
+    pdf = make_pdf(paginate(linkedin_profile(jobs=5, schools=2, realistic=True)[0]))
+    client = api.app.test_client()
+    logs = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+
+    def generate(n):
+        start = time.perf_counter()
+        response = client.post('/api/generate', data=form(pdf, 'bench' if args.warm_caches else f'bench{n}'))
+        return time.perf_counter() - start, response.status_code
+
+    print(f"gemini latency {args.gemini_latency}s, github latency {args.github_latency}s, 429 rate {args.error_rate}, "
+          f"{args.keys} key(s), caches {'warm' if args.warm_caches else 'off'}, batch {args.batch}")
+    rows = []
+    with logs:
+        for concurrency in args.concurrency:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(generate, range(args.requests)))
+            elapsed = time.perf_counter() - start
+            latencies = [latency for latency, _ in results]
+            ok = sum(status == 200 for _, status in results)
+            rows.append(f"{concurrency:>5} {args.requests:>5} {ok:>4} {percentile(latencies, 0.5) * 1000:>6.0f}ms "
+                        f"{percentile(latencies, 0.95) * 1000:>6.0f}ms {args.requests / elapsed:>7.2f}")
+
+        # Stage timings: offsets at which each streamed event arrives, averaged over a few runs.
+        stage_offsets = {}
+        for n in range(5):
+            start = time.perf_counter()
+            response = client.post('/api/generate/stream?format=ndjson', data=form(pdf, f'stage{n}'), buffered=False)
+            for chunk in response.response:
+                for line in chunk.decode().splitlines():
+                    stage = json.loads(line)['stage']
+                    stage_offsets.setdefault(stage, []).append(time.perf_counter() - start)
+            response.close()
+
+    print(f"{'conc':>5} {'reqs':>5} {'ok':>4} {'p50':>8} {'p95':>8} {'req/s':>7}")
+    print("\n".join(rows))
+    print("\nStage finished at (mean ms since request start):")
+    for stage, offsets in stage_offsets.items():
+        print(f"  {stage:>16}: {statistics.mean(offsets) * 1000:8.1f}")
+    calls = sum(len(model.calls) for model in factory.models.values())
+    rejected = sum(model.rejected for model in factory.models.values())
+    print(f"\nfake Gemini calls accepted {calls}, rejected with 429 {rejected}; fake GitHub requests {github.requests}")
+    github.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""Offline stand-ins for the upstream services used by the API, for benchmarks."""
+import base64
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_api():
+    """Import api/index.py as a module without needing real credentials, logging only warnings and errors."""
+    os.environ.setdefault('GEMINI_API_KEYS', 'bench-key')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    sys.path.insert(0, os.path.join(ROOT, 'api'))
+    import index
+    return index
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """Mimics `genai.GenerativeModel.generate_content` with fixed latency.
+
+    `rpm` makes the fake enforce its own per-minute quota and raise a 429 like the
+    real API when a caller goes over it, so rate limiting can be checked offline.
+    `error_rate` additionally fails that fraction of calls with a 429 at random.
+    """
+    def __init__(self, api_key, latency=0.2, rpm=None, reply="A generated description.", error_rate=0.0, seed=0):
+        self.api_key = api_key
+        self.latency = latency
+        self.rpm = rpm
+        self.reply = reply
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.calls = []
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self.lock:
+            now = time.monotonic()
+            self.calls = [t for t in self.calls if now - t < 60]
+            if (self.rpm is not None and len(self.calls) >= self.rpm) or self.rng.random() < self.error_rate:
+                self.rejected += 1
+                raise Exception("429 Resource has been exhausted (e.g. check quota).")
+            self.calls.append(now)
+        time.sleep(self.latency)
+        return FakeResponse(self.reply(prompt) if callable(self.reply) else self.reply)
+
+
+class FakeModelFactory:
+    """Callable suitable for `GeminiService(model_factory=...)` that remembers every model it built."""
+    def __init__(self, **model_kwargs):
+        self.model_kwargs = model_kwargs
+        self.models = {}
+
+    def __call__(self, api_key):
+        model = FakeGeminiModel(api_key, seed=len(self.models), **self.model_kwargs)
+        self.models[api_key] = model
+        return model
+
+
+def make_pdf(pages):
+    """Build a minimal text-only PDF; `pages` is a list of pages, each a list of lines."""
+    font_id = 3 + 2 * len(pages)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode()]
+    for i, lines in enumerate(pages):
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>".encode())
+        escaped = (line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines)
+        stream = "\n".join(["BT /F1 10 Tf 14 TL 50 760 Td", *(f"({line}) Tj T*" for line in escaped), "ET"]).encode()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    out, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]
+
+
+def _tenure(months):
+    years, months = divmod(months, 12)
+    parts = ([f"{years} year{'s' if years > 1 else ''}"] if years else []) + ([f"{months} month{'s' if months > 1 else ''}"] if months else [])
+    return " ".join(parts)
+
+
+def linkedin_profile(jobs=4, schools=2, filler_pages=0, seed=0, realistic=False, multi_role=False):
+    """Lines of a synthetic LinkedIn export, plus the experience and education records a correct parser should find.
+
+    The plain layout has exactly four lines per job and two per school. `realistic` adds what real
+    exports contain: month names and durations in dates, missing locations, description lines
+    under a role (some short and unpunctuated), certifications, and "Degree · (dates)" education lines.
+    `multi_role` (implies realistic) groups consecutive roles under one "Company / total tenure" header,
+    with dates and durations that add up the way LinkedIn computes them.
+    """
+    realistic = realistic or multi_role
+    rng = random.Random(seed)
+    months = ["January", "March", "June", "September"]
+    lines = ["Contact", "www.linkedin.com/in/bench", "Top Skills", "Python", "REST APIs"]
+    if realistic:
+        lines += ["Certifications", "Cloud Practitioner", "Data Engineering Basics"]
+    # Name, headline and (in every other export) location open the main column, straight after the sidebar.
+    lines += ["Bench User", "Software Engineer at Bench"] + (["Austin, Texas, United States"] if seed % 2 == 0 else [])
+    lines += ["Summary", "Engineer who builds reliable web services.", "Experience"]
+    experiences = []
+    # Month index of the current end of the timeline, walking back from the newest role.
+    cursor = 2024 * 12 + 5
+    i = 0
+    while i < jobs:
+        roles = min(rng.choice([1, 1, 2, 3]) if multi_role else 1, jobs - i)
+        company = f"Company {i}"
+        spans = []
+        for _ in range(roles):
+            length = rng.randint(3, 40)
+            spans.append((cursor - length + 1, cursor))
+            cursor -= length
+        cursor -= rng.randint(0, 6)
+        if roles > 1:
+            lines += [company, _tenure(spans[0][1] - spans[-1][0] + 1)]
+        for r, (start, end) in enumerate(spans):
+            if multi_role:
+                end_text = "Present" if i == 0 else f"{MONTH_NAMES[end % 12]} {end // 12}"
+                date = f"{MONTH_NAMES[start % 12]} {start // 12} - {end_text} ({_tenure(end - start + 1)})"
+            elif realistic:
+                date = f"{rng.choice(months)} {2010 + i} - {'Present' if i == 0 else f'{rng.choice(months)} {2011 + i}'} ({rng.randint(1, 11)} months)"
+            else:
+                date = f"{2010 + i} - {2011 + i}"
+            places = ["Remote", "Berlin, Germany", "Austin, Texas", "San Francisco Bay Area"]
+            location = rng.choice(places + [""]) if realistic else rng.choice(places[:3])
+            experience = {"company": company, "jobTitle": rng.choice(["Software Engineer", "Data Scientist", "Intern"]), "date": date, "location": location}
+            experiences.append(experience)
+            lines += ([] if roles > 1 else [company]) + [experience["jobTitle"], date] + ([location] if location else [])
+            if realistic:
+                lines += [rng.choice([f"Delivered project {i}.{n} for internal customers.", "Built internal tools", "Mentored new hires"])
+                          for n in range(rng.randint(0, 3))]
+            i += 1
+    lines.append("Education")
+    education = []
+    for i in range(schools):
+        if realistic:
+            record = {"school": f"University {i}", "degree": "Bachelor of Science, Computer Science", "date": f"{2000 + i} - {2004 + i}"}
+            lines += [record["school"], f"{record['degree']} · ({record['date']})"]
+        else:
+            record = {"school": f"University {i}", "date": f"{2000 + i} - {2004 + i}"}
+            lines += [record["school"], record["date"]]
+        education.append(record)
+    if filler_pages:
+        lines += ["Honors-Awards"] + [f"Award note {i}: lorem ipsum dolor sit amet." for i in range(filler_pages * 45)]
+    return lines, experiences, education
+
+
+def paginate(lines, per_page=45):
+    """Split lines into pages with LinkedIn-style 'Page x of y' footers."""
+    chunks = [lines[i:i + per_page] for i in range(0, len(lines), per_page)] or [[]]
+    return [chunk + [f"Page {n} of {len(chunks)}"] for n, chunk in enumerate(chunks, 1)]
+
+
+class FakeGitHubServer:
+    """Local stand-in for the GitHub REST endpoints GitHubService uses, with ETag support.
+
+    Every user has `repos` repositories (every fourth one a fork) with a short README.
+    """
+    def __init__(self, latency=0.05, repos=10):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                time.sleep(fake.latency)
+                with fake.lock:
+                    fake.requests += 1
+                parts = self.path.split('?')[0].strip('/').split('/')
+                if parts[0] == 'users' and len(parts) == 3 and parts[2] == 'repos':
+                    body = [{"name": f"{parts[1]}-project-{i}", "fork": i % 4 == 3, "size": 100, "description": f"Demo project {i}",
+                             "language": ["Python", "JavaScript", "Go"][i % 3], "topics": ["api", "web"], "html_url": f"https://github.com/{parts[1]}/project-{i}"}
+                            for i in range(fake.repos)]
+                elif parts[0] == 'users' and len(parts) == 2:
+                    body = {"login": parts[1], "name": parts[1].title(), "bio": "Software Developer", "html_url": f"https://github.com/{parts[1]}", "email": None, "location": "Remote"}
+                elif parts[0] == 'repos' and len(parts) == 4 and parts[3] == 'readme':
+                    body = {"content": base64.b64encode(f"# {parts[2]}\nA service that does useful things.".encode()).decode()}
+                else:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                data = json.dumps(body).encode()
+                etag = '"%s"' % hashlib.md5(data).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.latency = latency
+        self.repos = repos
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
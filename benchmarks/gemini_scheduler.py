@@ -0,0 +1,59 @@
+"""Throughput and rate-limit check for GeminiService using fake models.
+
+Prints timings and per-key call counts; the assertions live in tests/test_gemini_scheduler.py.
+
+Usage: python benchmarks/gemini_scheduler.py [--keys 3] [--projects 6] [--latency 0.2] [--rpm 15] [--batch]
+"""
+import argparse
+import json
+import time
+
+from fakes import FakeModelFactory, load_api
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--keys', type=int, default=3)
+    parser.add_argument('--projects', type=int, default=6)
+    parser.add_argument('--generations', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--rpm', type=float, default=15, help="quota enforced by each fake key")
+    parser.add_argument('--batch', action='store_true', help="describe all projects with one prompt")
+    args = parser.parse_args()
+
+    api = load_api()
+    api.Config.GEMINI_RPM = args.rpm
+    api.Config.GEMINI_BURST = int(args.rpm)
+    api.Config.GEMINI_BATCH_PROJECTS = args.batch
+    project_names = [f'Project {i}' for i in range(args.projects)]
+    reply = lambda prompt: json.dumps({name: "A generated description." for name in project_names}) if 'JSON object' in prompt else "A generated description."
+    factory = FakeModelFactory(latency=args.latency, rpm=args.rpm, reply=reply)
+    service = api.GeminiService([f"key-{i}" for i in range(args.keys)], model_factory=factory)
+
+    github_data = {
+        'profile': {'login': 'bench', 'name': 'Bench User'},
+        'repositories': [{'name': f'project-{i}', 'description': 'demo', 'language': 'Python', 'topics': ['api'], 'html_url': '#'} for i in range(args.projects)],
+    }
+    calls_per_generation = 2 if args.batch and args.projects > 1 else args.projects + 1
+    durations = []
+    for _ in range(args.generations):
+        start = time.perf_counter()
+        service.extract_user_data("Experience\nAcme\nEngineer\n2020 - 2024\nRemote\n", github_data, api.PDFParser())
+        durations.append(time.perf_counter() - start)
+
+    total_calls = sum(len(m.calls) for m in factory.models.values())
+    rejected = sum(m.rejected for m in factory.models.values())
+    print(f"\nkeys={args.keys} projects={args.projects} latency={args.latency}s rpm/key={args.rpm} batch={args.batch}")
+    for i, duration in enumerate(durations, 1):
+        print(f"  generation {i}: {duration:.2f}s ({calls_per_generation} model calls)")
+    print(f"  model calls accepted: {total_calls}, rejected with 429: {rejected}")
+    for key, model in sorted(factory.models.items()):
+        print(f"  {key}: {len(model.calls)} calls")
+    for key_stats in service.key_pool.stats():
+        print(f"  pool key {key_stats['index']}: {key_stats}")
+    serial_floor = (args.projects + 1) * args.latency + (args.projects - 1)
+    print(f"  previous serial pipeline would take at least {serial_floor:.2f}s per generation")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Size of generated documents per template, with and without the output optimisations.
+
+Renders every template from one generation's user data twice: embedding the full data into the
+unminified template, and with per-template data projection plus template minification. Reports
+raw and gzip sizes, and syntax-checks the minified inline scripts with node when it is installed.
+
+Usage: python benchmarks/output_size.py
+"""
+import gzip
+import io
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('GITHUB_CACHE_BACKEND', 'none')
+os.environ.setdefault('GENERATION_STORE_BACKEND', 'memory')
+
+from fakes import FakeGitHubServer, FakeModelFactory, linkedin_profile, load_api, make_pdf, paginate
+
+REPLY = "A generated description that covers what the project does, who it is for and how it works. " * 3
+
+
+def render_all(api, user_data, optimise):
+    api.Config.TEMPLATE_MINIFY = optimise
+    service = api.template_service.get()
+    service.registry = api.TemplateRegistry(service.templates_dir)
+    if not optimise:
+        for key, compiled in service.registry.templates.items():
+            service.registry.templates[key] = compiled._replace(fields=None)
+    return {f"{kind}{template_id}": service.render(user_data, template_id, kind).encode('utf-8')
+            for kind, template_id in sorted(service.registry.templates)}
+
+
+def scripts_parse(html):
+    node = shutil.which('node')
+    if node is None:
+        return None
+    for script in re.findall(rb'<script\b[^>]*>(.*?)</script>', html, re.DOTALL):
+        if not script.strip():
+            continue
+        with tempfile.NamedTemporaryFile('wb', suffix='.js', delete=False) as f:
+            f.write(script)
+        try:
+            if subprocess.run([node, '--check', f.name], capture_output=True).returncode:
+                return False
+        finally:
+            os.unlink(f.name)
+    return True
+
+
+def main():
+    api = load_api()
+    github = FakeGitHubServer(latency=0.0)
+    api.gemini_service.set(api.GeminiService(['bench-key'], model_factory=FakeModelFactory(latency=0.0, reply=REPLY)))
+    api.github_service.get().base_url = github.url
+    client = api.app.test_client()
+    pdf = make_pdf(paginate(linkedin_profile()[0]))
+    result = client.post('/api/generate', data={'linkedin_pdf': (io.BytesIO(pdf), 'profile.pdf'), 'github_url': 'https://github.com/sizes'}).get_json()
+    user_data = api.generation_store.get().load(result['generation_id'])['user_data']
+    github.stop()
+
+    baseline, optimised = render_all(api, user_data, False), render_all(api, user_data, True)
+    print(f"{'template':<12} {'raw before':>11} {'raw after':>10} {'gzip before':>12} {'gzip after':>11}  scripts")
+    for name in baseline:
+        before, after = baseline[name], optimised[name]
+        check = {None: 'n/a (no node)', True: 'ok', False: 'SYNTAX ERROR'}[scripts_parse(after)]
+        print(f"{name:<12} {len(before):>11} {len(after):>10} {len(gzip.compress(before, 6)):>12} {len(gzip.compress(after, 6)):>11}  {check}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark PDFParser.extract_text_from_pdf against the previous copy-and-concatenate extractor.
+
+Usage: python benchmarks/pdf_extraction.py [--pages 1 5 10 30] [--repeat 5]
+"""
+import argparse
+import io
+import time
+
+import PyPDF2
+
+from fakes import linkedin_profile, load_api, make_pdf, paginate
+
+
+def previous_extract(pdf_file):
+    pdf_file.seek(0)
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file.read()))
+    text = ""
+    for page in pdf_reader.pages:
+        page_text = page.extract_text()
+        if page_text and page_text.strip():
+            text += page_text + "\n"
+    return text
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 5, 10, 30])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    api = load_api()
+    uncached = api.PDFParser()
+    cached = api.PDFParser(cache=api.MemoryCacheBackend(16))
+    print(f"{'pages':>5} {'bytes':>8} {'previous':>10} {'streaming':>10} {'cached':>10} {'same sections':>14}")
+    for pages in args.pages:
+        lines, _, _ = linkedin_profile(jobs=6, schools=2, filler_pages=max(pages - 1, 0))
+        pdf = io.BytesIO(make_pdf(paginate(lines)))
+        previous_time, previous_text = best_of(args.repeat, lambda: previous_extract(pdf))
+        streaming_time, text = best_of(args.repeat, lambda: uncached.extract_text_from_pdf(pdf))
+        cached_time, _ = best_of(args.repeat, lambda: cached.extract_text_from_pdf(pdf))
+        same = uncached.extract_sections(previous_text) == uncached.extract_sections(text)
+        print(f"{pages:>5} {len(pdf.getvalue()):>8} {previous_time * 1000:>8.1f}ms {streaming_time * 1000:>8.1f}ms {cached_time * 1000:>8.1f}ms {str(same):>14}")
+
+
+if __name__ == '__main__':
+    main()
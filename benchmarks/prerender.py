@@ -0,0 +1,50 @@
+"""Server-side rendering, timed against client rendering.
+
+The server-rendered markup is checked against the templates' own scripts by tests/test_prerender.py.
+
+Usage: python benchmarks/prerender.py
+"""
+import io
+import os
+import re
+import time
+
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('GITHUB_CACHE_BACKEND', 'none')
+os.environ.setdefault('GENERATION_STORE_BACKEND', 'memory')
+
+from fakes import FakeGitHubServer, FakeModelFactory, linkedin_profile, load_api, make_pdf, paginate
+
+REPLY = "A generated description that covers what the project does, who it is for and how it works."
+
+
+def generation_user_data(api):
+    github = FakeGitHubServer(latency=0.0)
+    api.gemini_service.set(api.GeminiService(['bench-key'], model_factory=FakeModelFactory(latency=0.0, reply=REPLY)))
+    api.github_service.get().base_url = github.url
+    pdf = make_pdf(paginate(linkedin_profile()[0]))
+    result = api.app.test_client().post('/api/generate', data={'linkedin_pdf': (io.BytesIO(pdf), 'profile.pdf'), 'github_url': 'https://github.com/prerender'}).get_json()
+    github.stop()
+    return api.generation_store.get().load(result['generation_id'])['user_data']
+
+
+def main():
+    api = load_api()
+    user_data = generation_user_data(api)
+    service = api.template_service.get()
+    rounds = 200
+    print(f"{'template':<12} {'client ms':>10} {'server ms':>10} {'client KB':>10} {'server KB':>10}  scripts left")
+    for file_type, template_id in sorted(api.PRERENDERERS):
+        row = []
+        for mode in ('client', 'server'):
+            service.render(user_data, template_id, file_type, mode=mode)  # builds the StaticPage index
+            start = time.perf_counter()
+            for _ in range(rounds):
+                markup = service.render(user_data, template_id, file_type, mode=mode)
+            row += [(time.perf_counter() - start) / rounds * 1000, len(markup.encode('utf-8')) / 1024]
+        scripts = len(re.findall(r'<script\b', markup))
+        print(f"{file_type}{template_id:<4}    {row[0]:>10.3f} {row[2]:>10.3f} {row[1]:>10.1f} {row[3]:>10.1f}  {scripts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Correctness and scaling check for PDFParser's section tokenizer.
+
+Runs a corpus of synthetic LinkedIn exports (plain, realistic and multi-role layouts, several sizes)
+through the previous regex-and-stride parser and the single-pass tokenizer, reports how
+many documents each parsed exactly right, and times both as documents grow. The assertions
+live in tests/test_section_parser.py.
+
+Usage: python benchmarks/section_parser.py [--documents 50] [--repeat 20]
+"""
+import argparse
+import re
+import time
+
+from fakes import linkedin_profile, load_api, paginate
+
+
+def previous_extract_sections(text):
+    experiences, education = [], []
+    exp_match = re.search(r"Experience(.*?)(Education|Skills|$)", text, re.DOTALL | re.IGNORECASE)
+    if exp_match:
+        lines = [line.strip() for line in exp_match.group(1).strip().split('\n') if line.strip()]
+        i = 0
+        while i + 3 < len(lines):
+            experiences.append({"company": lines[i], "jobTitle": lines[i+1], "date": lines[i+2], "location": lines[i+3]})
+            i += 4
+    edu_match = re.search(r"Education(.*?)(Experience|Skills|Page|$)", text, re.DOTALL | re.IGNORECASE)
+    if edu_match:
+        lines = [line.strip() for line in edu_match.group(1).strip().split('\n') if line.strip()]
+        i = 0
+        while i + 1 < len(lines):
+            school, date = lines[i], lines[i+1]
+            if "Page" in school or "Page" in date: break
+            education.append({"school": school, "date": date})
+            i += 2
+    return experiences, education
+
+
+def document_text(lines):
+    return "\n".join(line for page in paginate(lines) for line in page)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--documents', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    api = load_api()
+    pdf_parser = api.PDFParser()
+
+    print("Correctness (documents parsed exactly right):")
+    for layout in ('plain', 'realistic', 'multi_role'):
+        previous_ok = new_ok = 0
+        for seed in range(args.documents):
+            lines, experiences, education = linkedin_profile(jobs=1 + seed % 8, schools=1 + seed % 3, seed=seed,
+                                                             realistic=layout == 'realistic', multi_role=layout == 'multi_role')
+            text = document_text(lines)
+            previous_ok += previous_extract_sections(text) == (experiences, education)
+            new_ok += pdf_parser.extract_sections(text) == (experiences, education)
+        print(f"  {layout:>10}: previous {previous_ok}/{args.documents}, tokenizer {new_ok}/{args.documents}")
+
+    print("\nScaling (best of %d):" % args.repeat)
+    print(f"{'jobs':>6} {'chars':>9} {'previous':>10} {'tokenizer':>10}")
+    for jobs in (5, 50, 500, 5000):
+        text = document_text(linkedin_profile(jobs=jobs, schools=3, realistic=True)[0])
+        timings = {}
+        for name, func in (('previous', previous_extract_sections), ('tokenizer', pdf_parser.extract_sections)):
+            best = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                func(text)
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+        print(f"{jobs:>6} {len(text):>9} {timings['previous'] * 1000:>8.2f}ms {timings['tokenizer'] * 1000:>8.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The tests share the benchmarks' offline fakes (load_api, FakeModelFactory, synthetic LinkedIn exports).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+for name, value in (('LLM_CACHE_BACKEND', 'none'), ('GITHUB_CACHE_BACKEND', 'none'), ('GENERATION_STORE_BACKEND', 'memory')):
+    os.environ.setdefault(name, value)
@@ -0,0 +1,90 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from fakes import FakeGeminiModel, FakeModelFactory, load_api
+
+
+@pytest.fixture(scope='module')
+def api():
+    return load_api()
+
+
+@pytest.fixture
+def config(api, monkeypatch):
+    monkeypatch.setattr(api.Config, 'GEMINI_BATCH_PROJECTS', False)
+    return api.Config
+
+
+def projects(count):
+    return [(f"project-{i}", "demo") for i in range(count)]
+
+
+def test_descriptions_stay_within_every_fake_key_quota(api, config, monkeypatch):
+    monkeypatch.setattr(config, 'GEMINI_RPM', 5)
+    monkeypatch.setattr(config, 'GEMINI_BURST', 5)
+    factory = FakeModelFactory(latency=0.01, rpm=5)
+    service = api.GeminiService([f"key-{i}" for i in range(3)], model_factory=factory)
+
+    descriptions = service.generate_project_descriptions(projects(15))
+
+    assert descriptions == ["A generated description."] * 15
+    assert sum(model.rejected for model in factory.models.values()) == 0
+    assert sorted(len(model.calls) for model in factory.models.values()) == [5, 5, 5]
+
+
+def test_concurrent_calls_spread_across_keys(api, config):
+    factory = FakeModelFactory(latency=0.1)
+    service = api.GeminiService([f"key-{i}" for i in range(3)], model_factory=factory)
+
+    start = time.perf_counter()
+    service.generate_project_descriptions(projects(6))
+    elapsed = time.perf_counter() - start
+
+    assert all(len(model.calls) == 2 for model in factory.models.values())
+    # Six 0.1 s calls over three keys overlap instead of running back to back.
+    assert elapsed < 0.45
+
+
+def test_rate_limited_key_falls_back_to_another_key(api, config):
+    models = {}
+
+    def factory(api_key):
+        models[api_key] = FakeGeminiModel(api_key, latency=0.0, error_rate=1.0 if api_key == 'limited' else 0.0)
+        return models[api_key]
+
+    service = api.GeminiService(['limited', 'healthy'], model_factory=factory)
+    # Make the limited key the pool's first choice.
+    service.key_pool.keys[1].last_limited_at = time.monotonic()
+
+    assert service.generate_content("prompt") == "A generated description."
+    assert models['limited'].rejected == 1
+    assert len(models['healthy'].calls) == 1
+    limited, healthy = service.key_pool.stats()
+    assert limited['rate_limited'] == 1 and limited['cooldown_remaining'] > 0
+    assert healthy['rate_limited'] == 0 and healthy['in_flight'] == 0
+
+
+def test_cooling_key_is_skipped_by_later_calls(api, config):
+    factory = FakeModelFactory(latency=0.0)
+    service = api.GeminiService(['key-0', 'key-1'], model_factory=factory)
+    service.key_pool.release(service.key_pool.acquire(exclude=set()), error=Exception("429 Resource has been exhausted"))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(service.generate_content, [f"prompt {i}" for i in range(8)]))
+
+    assert len(factory.models['key-0'].calls) == 0
+    assert len(factory.models['key-1'].calls) == 8
+
+
+def test_all_keys_rate_limited_falls_back_to_default_text(api, config):
+    factory = FakeModelFactory(latency=0.0, error_rate=1.0)
+    service = api.GeminiService(['key-0', 'key-1'], model_factory=factory)
+
+    start = time.perf_counter()
+    descriptions = service.generate_project_descriptions(projects(2))
+
+    assert descriptions == [service.default_project_description(name) for name, _ in projects(2)]
+    assert time.perf_counter() - start < 1
+    assert all(key['rate_limited'] >= 1 for key in service.key_pool.stats())
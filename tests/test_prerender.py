@@ -0,0 +1,150 @@
+"""Server renderers (RENDER_MODE=server) against the templates' own scripts.
+
+Each template's inline script is run in node against a recording `document`, with the same data
+the server renders. The recorded DOM writes (textContent, innerHTML, classList, attributes) are
+replayed one at a time onto the unminified template, and the result must match the server-rendered
+markup once scripts are removed and whitespace runs are collapsed. Several variants of one
+generation's data cover the templates' optional branches. Skipped without node.
+"""
+import copy
+import json
+import os
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from fakes import load_api
+from prerender import generation_user_data
+
+api = load_api()
+NODE = shutil.which('node')
+pytestmark = pytest.mark.skipif(NODE is None, reason="node is needed to run the template scripts")
+
+RECORDER = r"""
+const fs = require('fs');
+const [templateFile, entryPoint, dataFile] = process.argv.slice(1);
+const scripts = [...fs.readFileSync(templateFile, 'utf8').matchAll(/<script>([\s\S]*?)<\/script>/g)].map(m => m[1]);
+const ops = [];
+const anything = new Proxy(function () {}, {
+    get: (target, key) => key === Symbol.toPrimitive ? () => '' : anything,
+    apply: () => anything, construct: () => anything, set: () => true,
+});
+const asString = value => value === null ? '' : String(value);
+function element(id) {
+    return new Proxy({}, {
+        get(target, key) {
+            if (key === 'classList') return {
+                add: (...names) => names.forEach(name => ops.push(['add_class', id, name])),
+                remove: (...names) => names.forEach(name => ops.push(['remove_class', id, name])),
+                toggle: () => false, contains: () => false,
+            };
+            if (key === 'style') return new Proxy({}, { set(t, prop, value) { ops.push(['style', id, prop, String(value)]); return true; } });
+            if (key === 'setAttribute') return (name, value) => ops.push(['set_attribute', id, name, String(value)]);
+            return anything;
+        },
+        set(target, key, value) {
+            if (key === 'textContent' || key === 'innerText') ops.push(['text', id, asString(value)]);
+            else if (key === 'innerHTML') ops.push(['html', id, asString(value)]);
+            else if (typeof value !== 'function') ops.push(['set_attribute', id, key, String(value)]);
+            return true;
+        },
+    });
+}
+const document = new Proxy({}, {
+    get(target, key) {
+        if (key === 'getElementById') return id => element(id);
+        if (key === 'querySelector') return selector => element(selector.replace(/^[.#]/, ''));
+        return anything;
+    },
+});
+const data = JSON.parse(fs.readFileSync(dataFile, 'utf8'));
+new Function('document', 'window', 'setTimeout', 'setInterval', 'IntersectionObserver', 'localStorage',
+             scripts.join('\n') + `\n${entryPoint}(data);`)(document, anything, () => 0, () => 0, anything, anything);
+process.stdout.write(JSON.stringify(ops));
+"""
+
+
+def variants(user_data):
+    """The generated data, plus edits that take the templates' other branches (and some markup-sensitive text)."""
+    rich = copy.deepcopy(user_data)
+    rich['name'] = 'Ada <Lovelace> & Co'
+    rich['objective'] = 'An objective, used when there is no summary.'
+    rich['photo'] = 'https://example.com/photo.png'
+    rich['contact'].update(phone='+1 555 0100', address='1 Main St')
+    for i, exp in enumerate(rich['experience']):
+        exp['description'] = ['• Shipped things', '- Led people'] if i % 2 else 'Built a service\n\n* Cut latency by 40%\n'
+    rich['education'][0].update(date=' · (2000 - 2004)', details='Honours', location='London')
+    rich['certifications'] = [{'name': 'Cloud Architect', 'date': '2021', 'details': 'Professional'}]
+    rich['languages'] = ['English (Native)', 'French (Fluent)', 'Spanish (Conversational)', 'German', {'name': 'Latin', 'level': 40}]
+    rich['skills'][1]['items'] = ['Docker', {'name': 'Kubernetes', 'level': 80}]
+    p1, p2, p3 = (rich['portfolio_data'][f'template{i}'] for i in (1, 2, 3))
+    p1['services'] = [{'icon': 'uil-web-grid', 'title': 'Web', 'features': ['Sites', 'Apps']}]
+    p1['callToAction'] = {'title': 'Hire me', 'description': 'Now', 'image': 'cta.png'}
+    p1['about']['cvUrl'] = 'cv.pdf'
+    p1['footer']['copyright'] = '&#169; 2024'
+    p2['home']['greeting'] = "Hi, I'm"
+    p2['home']['buttons'] = {'hire': 'Hire', 'talk': 'Talk'}
+    p3['nav'] = [{'label': 'Work', 'id': 'projects'}]
+    p3.pop('copyright', None)
+
+    sparse = copy.deepcopy(user_data)
+    sparse.update(summary='', experience=[], projects=[], certifications=[], skills=[])
+    sparse['contact'] = {'email': 'a@example.com'}
+    p1, p2, p3 = (sparse['portfolio_data'][f'template{i}'] for i in (1, 2, 3))
+    p1.pop('qualification')
+    p1['home'].pop('socialLinks', None)
+    p2.pop('journey')
+    p2['home'].pop('greeting', None)
+    p3.update(skills=[], projects=[], social=[])
+    return {'generated': user_data, 'rich': rich, 'sparse': sparse}
+
+
+def replay(markup, ops):
+    for op, element_id, *args in ops:
+        if op == 'style':
+            raise ValueError(f"style writes are not replayed (#{element_id}.{args[0]})")
+        patch = api.PagePatch()
+        getattr(patch, op)(element_id, *args)
+        markup = api.StaticPage(markup).render(patch)
+    return markup
+
+
+def normalise(markup):
+    return re.sub(r'\s+', ' ', re.sub(r'<script\b[^>]*>.*?</script\s*>', '', markup, flags=re.DOTALL)).strip()
+
+
+@pytest.fixture(scope='module')
+def datasets():
+    return variants(generation_user_data(api))
+
+
+@pytest.fixture(scope='module')
+def service():
+    # Compared against the unminified templates, which the recorded writes are replayed onto.
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(api.Config, 'TEMPLATE_MINIFY', False)
+        service = api.TemplateService(api.artifact_store.get())
+    return service
+
+
+@pytest.mark.parametrize('variant', ['generated', 'rich', 'sparse'])
+@pytest.mark.parametrize('file_type,template_id', sorted(api.PRERENDERERS), ids=lambda value: str(value))
+def test_server_render_matches_template_script(service, datasets, tmp_path, file_type, template_id, variant):
+    path = os.path.join(service.templates_dir, f"{file_type}{template_id}.html")
+    with open(path, encoding='utf-8') as f:
+        template = f.read()
+    user_data = datasets[variant]
+    data_file = tmp_path / 'data.json'
+    data_file.write_text(json.dumps(service._template_data(user_data, template_id, file_type)))
+    entry_point = 'renderResume' if file_type == 'resume' else 'renderPortfolio'
+
+    recorded = subprocess.run([NODE, '-e', RECORDER, path, entry_point, str(data_file)], capture_output=True, text=True)
+    assert recorded.returncode == 0, recorded.stderr
+
+    expected = normalise(replay(template, json.loads(recorded.stdout)))
+    # Called directly: TemplateService.render falls back to client rendering when a renderer raises.
+    patch = api.PagePatch()
+    api.PRERENDERERS[(file_type, template_id)](patch, api.js_value(service._template_data(user_data, template_id, file_type)))
+    assert normalise(service.registry.page(file_type, template_id).render(patch)) == expected
@@ -0,0 +1,86 @@
+import io
+
+import pytest
+
+from fakes import linkedin_profile, load_api, make_pdf, paginate
+
+
+@pytest.fixture(scope='module')
+def parser():
+    return load_api().PDFParser()
+
+
+def document_text(lines):
+    return "\n".join(line for page in paginate(lines) for line in page)
+
+
+def experience_text(*lines):
+    return "\n".join(("Summary", "Engineer.", "Experience") + lines + ("Education", "University 0", "2000 - 2004"))
+
+
+@pytest.mark.parametrize('layout', [{}, {'realistic': True}, {'multi_role': True}], ids=['plain', 'realistic', 'multi_role'])
+@pytest.mark.parametrize('seed', range(25))
+def test_generated_exports_parse_exactly(parser, layout, seed):
+    lines, experiences, education = linkedin_profile(jobs=1 + seed % 8, schools=1 + seed % 3, seed=seed, **layout)
+    assert parser.extract_sections(document_text(lines)) == (experiences, education)
+
+
+def test_roles_under_one_company_header(parser):
+    experiences, _ = parser.extract_sections(experience_text(
+        "Acme Corp", "5 years 3 months",
+        "Staff Engineer", "June 2021 - Present (3 years 1 month)", "Austin, Texas", "Led the platform team.",
+        "Senior Engineer", "April 2019 - May 2021 (2 years 2 months)", "Remote",
+        "Initech", "Engineer", "January 2017 - March 2019 (2 years 3 months)", "Berlin, Germany",
+    ))
+    assert experiences == [
+        {"company": "Acme Corp", "jobTitle": "Staff Engineer", "date": "June 2021 - Present (3 years 1 month)", "location": "Austin, Texas"},
+        {"company": "Acme Corp", "jobTitle": "Senior Engineer", "date": "April 2019 - May 2021 (2 years 2 months)", "location": "Remote"},
+        {"company": "Initech", "jobTitle": "Engineer", "date": "January 2017 - March 2019 (2 years 3 months)", "location": "Berlin, Germany"},
+    ]
+
+
+def test_short_description_line_is_not_a_location(parser):
+    experiences, _ = parser.extract_sections(experience_text(
+        "Acme Corp", "Engineer", "March 2020 - Present (4 years)", "Built internal tools",
+        "Initech", "Intern", "June 2019 - February 2020 (9 months)", "San Francisco Bay Area",
+    ))
+    assert [record["location"] for record in experiences] == ["", "San Francisco Bay Area"]
+    assert [record["company"] for record in experiences] == ["Acme Corp", "Initech"]
+
+
+@pytest.mark.parametrize('location', [["Austin, Texas, United States"], []], ids=['with_location', 'without_location'])
+def test_sidebar_ends_at_the_profile_block(parser, location):
+    profile = ["Jane Doe", "Senior Software Engineer at Acme"] + location
+    sections = parser.parse_sections("\n".join(
+        ["Contact", "jane@example.com", "Top Skills", "Python", "Go", "Languages", "English (Native or Bilingual)",
+         "Certifications", "AWS Certified Cloud Practitioner"] + profile + ["Summary", "Engineer.", "Experience"]
+    ))
+    assert sections["certifications"] == [{"name": "AWS Certified Cloud Practitioner"}]
+    assert sections["languages"] == ["English (Native or Bilingual)"]
+    assert sections["skills"] == ["Python", "Go"]
+    assert sections["summary"] == "Engineer."
+    assert parser.tokenize_sections("\n".join(["Languages", "English"] + profile + ["Experience"])) == {
+        "languages": ["English"], "profile": profile, "experience": [],
+    }
+
+
+def test_sections_run_across_page_footers(parser):
+    lines, experiences, education = linkedin_profile(jobs=30, schools=2, seed=1, realistic=True)
+    text = document_text(lines)
+    assert "Page 2 of" in text
+    assert parser.extract_sections(text) == (experiences, education)
+
+
+def test_long_export_is_read_to_the_end(parser):
+    lines, experiences, education = linkedin_profile(jobs=120, schools=2, seed=2)
+    pages = paginate(lines)
+    assert len(pages) > 10
+    text = parser.extract_text_from_pdf(io.BytesIO(make_pdf(pages)))
+    assert parser.extract_sections(text) == (experiences, education)
+
+
+def test_export_over_the_page_limit_is_rejected(parser, monkeypatch):
+    api = load_api()
+    monkeypatch.setattr(api.Config, 'PDF_MAX_PAGES', 2)
+    with pytest.raises(api.PDFTooLargeError, match="3 pages"):
+        parser.extract_text_from_pdf(io.BytesIO(make_pdf([["Summary"], ["Engineer."], ["Education"]])))